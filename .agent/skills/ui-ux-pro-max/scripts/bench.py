@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Bench - reproducible latency/throughput benchmark for search and design-system generation
+Usage: python bench.py [--scales 1,10,100] [--queries 50] [--repeat 5] [--seed 7]
+       python bench.py --save-baseline bench-baseline.json
+       python bench.py --compare bench-baseline.json [--tolerance 0.15]
+
+Measures, per corpus scale (synthetic copies of the shipped CSV rows):
+  cold      fresh interpreter running one search, on-disk index cache warm
+  cold-raw  fresh interpreter running one search, index cache disabled
+  warm      in-process search() latency per domain and stack, indexes loaded
+  batch     search_many() over the whole query set per domain (amortized per query)
+  design    DesignSystemGenerator.generate() with its memo cache disabled
+
+Every metric reports p50/p95/p99 latency (ms) and throughput (ops/s). --compare
+exits with status 1 when any p50 is slower than the baseline by more than --tolerance.
+"""
+
+import argparse
+import csv
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import core
+import design_system
+from core import CSV_CONFIG, STACK_CONFIG, _STACK_COLS, search, search_many, search_stack
+
+SCRIPTS_DIR = Path(__file__).parent
+SOURCE_DATA_DIR = core.DATA_DIR
+
+# One search in a fresh interpreter; argv: scripts dir, data dir, cache dir ("" disables), domain, query
+_COLD_CHILD = """
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+import core
+core.DATA_DIR = Path(sys.argv[2])
+core.INDEX_CACHE_DIR = Path(sys.argv[3]) if sys.argv[3] else None
+core.QUERY_CACHE_SIZE = 0
+core.search(sys.argv[5], sys.argv[4])
+"""
+
+
+# ============ SYNTHETIC CORPUS ============
+def build_corpus(target: Path, scale: int) -> Path:
+    """Copy the data directory with every CSV's rows repeated scale times (copies get a marker token)."""
+    for src in sorted(SOURCE_DATA_DIR.rglob("*.csv")):
+        dst = target / src.relative_to(SOURCE_DATA_DIR)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with open(src, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = list(reader)
+        with open(dst, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for copy in range(scale):
+                for row in rows:
+                    if copy and row:
+                        row = [f"{row[0]} copy{copy}"] + [f"{cell} r{copy}" if cell else cell for cell in row[1:]]
+                    writer.writerow(row)
+    return target
+
+
+def sample_queries(data_dir: Path, filename: str, search_cols: list, count: int, rng: random.Random) -> list:
+    """Deterministic 1-4 word queries drawn from a file's searchable text."""
+    with open(data_dir / filename, 'r', encoding='utf-8') as f:
+        words = sorted({w for row in csv.DictReader(f) for col in search_cols for w in str(row.get(col, "")).split()})
+    if not words:
+        return ["design"] * count
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(count)]
+
+
+# ============ MEASUREMENT ============
+def summarize(samples: list) -> dict:
+    """Latency percentiles in ms and throughput for a list of per-op durations in seconds."""
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(pct(50), 4),
+        "p95_ms": round(pct(95), 4),
+        "p99_ms": round(pct(99), 4),
+        "ops_per_s": round(len(ordered) / total, 1) if total else 0.0
+    }
+
+
+def timed(fn, *args) -> float:
+    """Seconds taken by one call."""
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def bench_cold(data_dir: Path, cache_dir, domain: str, queries: list, repeat: int) -> dict:
+    """Wall time of a fresh interpreter answering one query."""
+    samples = []
+    for i in range(repeat):
+        argv = [sys.executable, "-c", _COLD_CHILD, str(SCRIPTS_DIR), str(data_dir),
+                str(cache_dir) if cache_dir else "", domain, queries[i % len(queries)]]
+        start = time.perf_counter()
+        subprocess.run(argv, check=True)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def run_scale(scale: int, args, rng: random.Random) -> dict:
+    """All metrics for one corpus scale; keys look like '10x/warm/style'."""
+    metrics = {}
+    workdir = Path(tempfile.mkdtemp(prefix=f"uipro-bench-{scale}x-"))
+    saved_cache_dir, saved_query_cache = core.INDEX_CACHE_DIR, core.QUERY_CACHE_SIZE
+    try:
+        core.QUERY_CACHE_SIZE = 0  # measure the engine, not memoized results
+        data_dir = build_corpus(workdir / "data", scale)
+        cache_dir = workdir / "cache"
+        core.DATA_DIR = design_system.DATA_DIR = data_dir
+        core.INDEX_CACHE_DIR = cache_dir
+        core.clear_index_cache()
+
+        domain_queries = {d: sample_queries(data_dir, c["file"], c["search_cols"], args.queries, rng)
+                          for d, c in CSV_CONFIG.items()}
+        stack_queries = {s: sample_queries(data_dir, c["file"], _STACK_COLS["search_cols"], args.queries, rng)
+                         for s, c in STACK_CONFIG.items()}
+
+        # Cold start: first build the disk cache, then time fresh processes against it
+        core.build_index_cache()
+        metrics[f"{scale}x/cold/style"] = bench_cold(data_dir, cache_dir, "style", domain_queries["style"], args.repeat)
+        metrics[f"{scale}x/cold-raw/style"] = bench_cold(data_dir, None, "style", domain_queries["style"], args.repeat)
+
+        for domain, queries in domain_queries.items():
+            metrics[f"{scale}x/warm/{domain}"] = summarize([timed(search, q, domain) for q in queries])
+            # Amortized per-query time of one batch call, sampled over repeated batches
+            batches = [timed(search_many, queries, domain) / len(queries) for _ in range(args.repeat)]
+            metrics[f"{scale}x/batch/{domain}"] = summarize(batches)
+        for stack, queries in stack_queries.items():
+            metrics[f"{scale}x/warm/stack:{stack}"] = summarize([timed(search_stack, q, stack) for q in queries])
+
+        generator = design_system.DesignSystemGenerator(cache_size=0)
+        product_queries = domain_queries["product"][:max(1, args.queries // 5)]
+        metrics[f"{scale}x/design/generate"] = summarize([timed(generator.generate, q) for q in product_queries])
+    finally:
+        core.DATA_DIR = design_system.DATA_DIR = SOURCE_DATA_DIR
+        core.INDEX_CACHE_DIR, core.QUERY_CACHE_SIZE = saved_cache_dir, saved_query_cache
+        core.clear_index_cache()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return metrics
+
+
+# ============ REPORTING ============
+def format_report(metrics: dict, baseline: dict = None) -> str:
+    """Fixed-width table, with the p50 change when a baseline is given."""
+    lines = [f"{'metric':<36} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10}" + ("  vs baseline" if baseline else "")]
+    for name, m in metrics.items():
+        line = f"{name:<36} {m['p50_ms']:>10.3f} {m['p95_ms']:>10.3f} {m['p99_ms']:>10.3f} {m['ops_per_s']:>10.1f}"
+        if baseline and name in baseline and baseline[name]["p50_ms"]:
+            line += f"  {m['p50_ms'] / baseline[name]['p50_ms'] - 1:+.1%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def regressions(metrics: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics whose p50 got slower than baseline by more than tolerance."""
+    return [name for name, m in metrics.items()
+            if name in baseline and baseline[name]["p50_ms"] and m["p50_ms"] > baseline[name]["p50_ms"] * (1 + tolerance)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max benchmark")
+    parser.add_argument("--scales", type=str, default="1,10,100", help="Comma-separated corpus multipliers (default: 1,10,100)")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per domain/stack (default: 50)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh-process runs per cold-start metric (default: 5)")
+    parser.add_argument("--seed", type=int, default=7, help="Query sampling seed (default: 7)")
+    parser.add_argument("--json", action="store_true", help="Output metrics as JSON")
+    parser.add_argument("--save-baseline", type=str, default=None, help="Write metrics to this JSON file")
+    parser.add_argument("--compare", type=str, default=None, help="Compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed p50 slowdown vs baseline (default: 0.15)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    metrics = {}
+    for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+        metrics.update(run_scale(scale, args, rng))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["metrics"]
+
+    if args.json:
+        print(json.dumps(metrics, indent=2))
+    else:
+        print(format_report(metrics, baseline))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], "args": vars(args), "metrics": metrics}, f, indent=2)
+
+    if baseline is not None:
+        slower = regressions(metrics, baseline, args.tolerance)
+        if slower:
+            print(f"\nRegressed beyond {args.tolerance:.0%}: {', '.join(slower)}", file=sys.stderr)
+            sys.exit(1)
@@ -4,16 +4,58 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
-import csv
+import marshal
+import os
 import re
+import sys
+import time
+import zlib
+from array import array
 from pathlib import Path
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from itertools import accumulate
+from heapq import heappush, heapreplace, nsmallest
 from math import log
-from collections import defaultdict
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
 
+# Extra data directories (e.g. a project's design-system/data/) whose CSVs add rows to the shipped
+# file at the same relative path. Each keeps its own index, merged with the base index at query
+# time with combined statistics, so customizing never re-indexes the shipped data (see find_overlay_dirs)
+OVERLAY_DIRS = []
+
+# Compiled indexes are cached here between CLI runs (set to None to disable)
+INDEX_CACHE_DIR = Path(__file__).parent.parent / ".index-cache"
+_INDEX_CACHE_VERSION = 6
+
+# Also publish each index as a flat .map file and mmap it read-only: concurrent search
+# processes share one copy of the postings, statistics and rows through the page cache
+SHARED_INDEX = True
+
+# Search results are memoized per (file, query token multiset, max_results, mode) in an LRU of this
+# many entries (0 disables); with QUERY_CACHE_PERSIST it is also kept in INDEX_CACHE_DIR across CLI runs
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_PERSIST = True
+
+# Edited CSVs are patched with a delta segment; merge back into one once masked + delta rows exceed this share
+DELTA_MERGE_RATIO = 0.25
+
+# Fold accented letters to their base form when tokenizing ("café" matches "cafe")
+FOLD_ACCENTS = False
+
+# "bm25" ranks by BM25 alone; "hybrid" fuses max-normalised BM25 with hashed TF-IDF cosine similarity
+RETRIEVAL_MODE = "bm25"
+HYBRID_BM25_WEIGHT = 0.5
+VECTOR_HASH_BITS = 20
+
+# Query words no domain or stack index contains are corrected to the closest word of the searched
+# index ("glasmorphism"); real words another file knows ("booking") are left alone
+FUZZY_MATCH = True
+FUZZY_MIN_LENGTH = 5
+
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
@@ -83,6 +125,22 @@ STACK_CONFIG = {
     "jetpack-compose": {"file": "stacks/jetpack-compose.csv"}
 }
 
+# Keyword hits per domain decide auto-detection; "bm25" breaks ties (and no-hit queries) by the best row across domains
+DOMAIN_ROUTING = "keywords"
+
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+}
+
 # Common columns for all stacks
 _STACK_COLS = {
     "search_cols": ["Category", "Guideline", "Description", "Do", "Don't"],
@@ -92,127 +150,1942 @@ _STACK_COLS = {
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
 
+# ============ PROFILING ============
+class Profiler:
+    """Wall and CPU time of every profile_stage() entered while it is active"""
+
+    def __init__(self):
+        import threading
+        self.thread_id = threading.get_ident
+        self.events = []  # (name, start, wall seconds, cpu seconds, thread id, args)
+        self.started = time.perf_counter()
+        self.stopped = None
+
+    def summary(self):
+        """Per-stage totals, slowest first; wall % is relative to the whole profiled run"""
+        span = (self.stopped or time.perf_counter()) - self.started
+        totals = {}
+        for name, _, wall, cpu, _, _ in self.events:
+            calls, wall_sum, cpu_sum = totals.get(name, (0, 0.0, 0.0))
+            totals[name] = (calls + 1, wall_sum + wall, cpu_sum + cpu)
+
+        lines = [f"{'stage':<32} {'calls':>6} {'wall ms':>10} {'cpu ms':>10} {'wall %':>7}"]
+        for name, (calls, wall, cpu) in sorted(totals.items(), key=lambda x: -x[1][1]):
+            share = wall / span * 100 if span else 0.0
+            lines.append(f"{name:<32} {calls:>6} {wall * 1000:>10.2f} {cpu * 1000:>10.2f} {share:>6.1f}%")
+        lines.append(f"{'total':<32} {'':>6} {span * 1000:>10.2f}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Complete ("X") events in the Chrome trace-viewer / Perfetto JSON format"""
+        pid = os.getpid()
+        events = []
+        for name, start, wall, cpu, tid, args in self.events:
+            events.append({"name": name, "cat": "uipro", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": round((start - self.started) * 1e6, 3), "dur": round(wall * 1e6, 3),
+                           "args": dict(args, cpu_ms=round(cpu * 1000, 3))})
+        events.sort(key=lambda e: e["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+class _Stage:
+    """Times one stage into a Profiler"""
+
+    __slots__ = ("profiler", "name", "args", "start", "cpu")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.cpu = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start
+        cpu = time.thread_time() - self.cpu
+        self.profiler.events.append((self.name, self.start, wall, cpu, self.profiler.thread_id(), self.args))
+        return False
+
+
+class _NullStage:
+    """profile_stage() while profiling is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+_PROFILER = None
+
+
+def start_profiling():
+    """Record every profile_stage() from now on (all threads) into a new Profiler"""
+    global _PROFILER
+    _PROFILER = Profiler()
+    return _PROFILER
+
+
+def stop_profiling():
+    """Stop recording and return the Profiler (None if profiling was not started)"""
+    global _PROFILER
+    profiler, _PROFILER = _PROFILER, None
+    if profiler is not None:
+        profiler.stopped = time.perf_counter()
+    return profiler
+
+
+def profile_stage(name, **args):
+    """Context manager timing a named stage; nearly free when profiling is off"""
+    profiler = _PROFILER
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name, args)
+
+
+# ============ TOKENIZER ============
+_WORD_RE = re.compile(r'\w+')
+
+
+class Tokenizer:
+    """Precompiled word tokenizer shared by indexing and querying"""
+
+    def __init__(self, fold_accents=FOLD_ACCENTS, min_length=3):
+        self.fold_accents = fold_accents
+        self.min_length = min_length
+
+    @property
+    def signature(self):
+        """Settings that change the token stream (part of the on-disk cache key)"""
+        return (self.fold_accents, self.min_length)
+
+    def __call__(self, text):
+        """Lowercase, optionally strip accents, split on non-word characters, filter short words"""
+        text = str(text).lower()
+        if self.fold_accents:
+            import unicodedata
+            text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+        return [w for w in _WORD_RE.findall(text) if len(w) >= self.min_length]
+
+
+# ============ FUZZY MATCHING ============
+def _trigrams(word):
+    """Distinct character trigrams of a word padded with one boundary marker per side"""
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions),
+    or limit + 1 as soon as it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        if min(row) > limit:
+            return limit + 1
+        prev2, prev = prev, row
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+class TrigramIndex:
+    """
+    Character-trigram index over a vocabulary for typo correction.
+
+    One edit changes at most three trigrams, so a word within d edits of the
+    query shares at least len(trigrams(query)) - 3d of them. Candidates come from
+    the query's trigram postings only; edit distance is verified on survivors.
+    """
+
+    def __init__(self, weights):
+        """weights: {word: document frequency}, used to prefer common corrections"""
+        self.weights = weights
+        self.postings = {}
+        for word in sorted(weights):
+            for gram in _trigrams(word):
+                self.postings.setdefault(gram, []).append(word)
+
+    @staticmethod
+    def max_edits(word):
+        """Edits tolerated for a word of this length (none below FUZZY_MIN_LENGTH)"""
+        if len(word) < FUZZY_MIN_LENGTH:
+            return 0
+        return 1 if len(word) < 9 else 2
+
+    def correct(self, word):
+        """Closest vocabulary word (fewest edits, then most frequent), or None"""
+        limit = self.max_edits(word)
+        if not limit:
+            return None
+        grams = _trigrams(word)
+        shared = {}
+        for gram in grams:
+            for candidate in self.postings.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        needed = max(1, len(grams) - 3 * limit)
+        best = None
+        for candidate, count in shared.items():
+            if count < needed or abs(len(candidate) - len(word)) > limit:
+                continue
+            distance = edit_distance(word, candidate, limit)
+            if distance > limit:
+                continue
+            key = (distance, -self.weights[candidate], candidate)
+            if best is None or key < best:
+                best = key
+        return best[2] if best else None
+
+
+# ============ POSTINGS CODEC ============
+# Postings are coded in blocks of this many documents
+POSTINGS_BLOCK = 128
+
+# Documents get a one-byte length code; lengths are exact up to this many distinct values per segment
+_LENGTH_CODES = 256
+
+
+def _encode_varint(value, out):
+    """Append value as an unsigned LEB128 varint (7 bits per byte, high bit = more)"""
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varints(buf, pos, count):
+    """count varints starting at buf[pos]; returns (values, position after them)"""
+    values = []
+    for _ in range(count):
+        byte = buf[pos]
+        pos += 1
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = buf[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        values.append(value)
+    return values, pos
+
+
+def _narrow(values):
+    """array of non-negative ints in the smallest unsigned typecode that holds them"""
+    top = max(values, default=0)
+    return array('B' if top < 1 << 8 else 'H' if top < 1 << 16 else 'I', values)
+
+
+def _quantize_lengths(doc_lengths):
+    """
+    (bytes with one code per document, array of the length each code stands for).
+
+    Exact while a segment has at most _LENGTH_CODES distinct lengths; beyond that
+    the codes are quantile buckets and a length rounds down to its bucket's.
+    """
+    distinct = sorted(set(doc_lengths))
+    if len(distinct) <= _LENGTH_CODES:
+        code = {dl: c for c, dl in enumerate(distinct)}
+        return bytes(code[dl] for dl in doc_lengths), _narrow(distinct)
+    table = [distinct[c * len(distinct) // _LENGTH_CODES] for c in range(_LENGTH_CODES)]
+    return bytes(bisect_right(table, dl) - 1 for dl in doc_lengths), _narrow(table)
+
+
 # ============ BM25 IMPLEMENTATION ============
+# Absorbs float rounding between upper bounds and exact scores when pruning
+_BOUND_SLACK = 1e-9
+
+# Row id of a document masked out by a delta update
+DELETED = -1
+
+
+class Segment:
+    """
+    Immutable inverted index over one batch of documents.
+
+    Tokens are interned to local term ids. Term t's postings, sorted by local doc
+    id, are postings[offsets[t]:offsets[t + 1]]: blocks of POSTINGS_BLOCK
+    documents, each holding varint doc id gaps followed by varint term
+    frequencies, and are decoded one block at a time. Document lengths are
+    one-byte codes into len_table. A segment holds no corpus-wide statistics, so
+    several of them (a base plus deltas) can be scored together without
+    rebuilding any of them.
+    """
+
+    _ARRAYS = ("offsets", "df", "max_tf", "min_len", "len_table")
+    _BYTES = ("postings", "len_codes")
+
+    def __init__(self):
+        self.vocab = {}
+        self.postings = b""
+        self.offsets = array('I', [0])
+        self.df = array('I')           # per term: number of postings (narrowed once built)
+        self.len_codes = b""
+        self.len_table = array('I')
+        # Per term: highest tf and shortest document among its postings (score upper bounds)
+        self.max_tf = array('I')
+        self.min_len = array('I')
+
+    @classmethod
+    def build(cls, token_lists):
+        """Index tokenized documents; local doc ids follow input order"""
+        term_postings = {}
+        doc_lengths = array('I')
+        for idx, tokens in enumerate(token_lists):
+            doc_lengths.append(len(tokens))
+            term_freqs = {}
+            for word in tokens:
+                term_freqs[word] = term_freqs.get(word, 0) + 1
+            for word, tf in term_freqs.items():
+                plist = term_postings.get(word)
+                if plist is None:
+                    plist = term_postings[word] = (array('I'), array('I'))
+                plist[0].append(idx)
+                plist[1].append(tf)
+        return cls.from_postings(term_postings, doc_lengths)
+
+    @classmethod
+    def from_postings(cls, term_postings, doc_lengths):
+        """Encode {token: (doc ids, tfs)} with ascending doc ids into blocks"""
+        seg = cls()
+        seg.len_codes, seg.len_table = _quantize_lengths(doc_lengths)
+        lengths = [seg.len_table[c] for c in seg.len_codes]
+        out = bytearray()
+        for word, (docs, tfs) in term_postings.items():
+            seg.vocab[word] = len(seg.vocab)
+            prev = 0
+            for first in range(0, len(docs), POSTINGS_BLOCK):
+                for doc in docs[first:first + POSTINGS_BLOCK]:
+                    _encode_varint(doc - prev, out)
+                    prev = doc
+                for tf in tfs[first:first + POSTINGS_BLOCK]:
+                    _encode_varint(tf, out)
+            seg.offsets.append(len(out))
+            seg.df.append(len(docs))
+            seg.max_tf.append(max(tfs))
+            # Bounds must hold for the lengths scoring sees, i.e. the quantized ones
+            seg.min_len.append(min(lengths[d] for d in docs))
+        seg.postings = bytes(out)
+        seg.df, seg.max_tf, seg.min_len = _narrow(seg.df), _narrow(seg.max_tf), _narrow(seg.min_len)
+        return seg
+
+    def blocks(self, t):
+        """Yield (doc ids, tfs) of term t one block at a time"""
+        buf = self.postings
+        pos, df = self.offsets[t], self.df[t]
+        # Every gap and tf fits one byte (the common case): blocks are plain byte slices
+        single = self.offsets[t + 1] - pos == 2 * df
+        prev = 0
+        for first in range(0, df, POSTINGS_BLOCK):
+            n = min(POSTINGS_BLOCK, df - first)
+            if single:
+                gaps, tfs = buf[pos:pos + n], buf[pos + n:pos + 2 * n]
+                pos += 2 * n
+            else:
+                gaps, pos = _decode_varints(buf, pos, n)
+                tfs, pos = _decode_varints(buf, pos, n)
+            docs = list(accumulate(gaps, initial=prev))
+            del docs[0]
+            prev = docs[-1]
+            yield docs, tfs
+
+    def decode(self, t):
+        """(doc ids, tfs) lists of term t's whole postings"""
+        docs, tfs = [], []
+        for block_docs, block_tfs in self.blocks(t):
+            docs += block_docs
+            tfs += block_tfs
+        return docs, tfs
+
+    def doc_lengths(self):
+        """Length of every document, as scored (quantized)"""
+        table = self.len_table
+        return [table[c] for c in self.len_codes]
+
+    def state(self):
+        """Plain-data snapshot (marshal-friendly; arrays as raw bytes)"""
+        state = {"vocab": list(self.vocab)}
+        for name in self._ARRAYS:
+            arr = getattr(self, name)
+            state[name] = (arr.typecode, arr.tobytes())
+        for name in self._BYTES:
+            state[name] = bytes(getattr(self, name))
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        seg = cls()
+        seg.vocab = {token: t for t, token in enumerate(state["vocab"])}
+        for name in cls._ARRAYS:
+            typecode, raw = state[name]
+            arr = array(typecode)
+            arr.frombytes(raw)
+            setattr(seg, name, arr)
+        for name in cls._BYTES:
+            setattr(seg, name, state[name])
+        return seg
+
+
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """
+    BM25 ranking algorithm for text search over one or more index segments.
+
+    Documents are identified by their row (position in the source corpus);
+    results are (row, score). fit() indexes a corpus as a single segment.
+    with_delta() returns a new index for an edited corpus: removed rows are
+    masked, added or changed rows go into a small delta segment, and
+    corpus-wide statistics (N, average length, document frequencies, IDF) are
+    recombined so scores match a full rebuild exactly. Once the delta grows past
+    DELTA_MERGE_RATIO of the corpus, segments are merged from their postings.
+
+    Tokens are interned once per index: every segment's local term ids map to
+    index-wide term ids, which key the document frequency, IDF and score bound
+    arrays. A query resolves each token to its term id once; scoring reads arrays.
+    """
 
-    def __init__(self, k1=1.5, b=0.75):
+    _MAX_CORRECTIONS = 4096
+
+    def __init__(self, k1=1.5, b=0.75, tokenizer=None):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.tokenizer = tokenizer or Tokenizer()
+        self.segments = []
+        self.rows = []         # per segment: array('i') local doc -> row, DELETED if removed
+        self.df_adjust = {}    # token -> correction for masked docs still in segment postings
+        self.norms = []        # per segment: length-normalisation part of the BM25 denominator, per length code
+        self.terms = {}        # token -> term id over all segments
+        self.term_maps = []    # per segment: array local term id -> term id
+        self.doc_freqs = array('I')   # per term id: live document frequency (0 once all its docs are masked)
+        self.idf = array('d')
+        self.max_impact = array('d')  # per term id: upper bound of its contribution to any document
         self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
         self.N = 0
+        self._trigram_index = None  # built on the first unknown query token
+        self._corrections = {}
+        self._frozen = False
 
     def tokenize(self, text):
-        """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        """Tokenize with this index's tokenizer"""
+        return self.tokenizer(text)
 
     def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        """Build inverted index: postings of (doc, term frequency), doc lengths and IDF"""
+        if self._frozen:
+            raise RuntimeError("BM25 index is frozen; fit a new one instead")
+        with profile_stage("BM25.fit", docs=len(documents)):
+            with profile_stage("tokenize"):
+                token_lists = [self.tokenize(doc) for doc in documents]
+            self._assign([Segment.build(token_lists)], [array('i', range(len(token_lists)))], {})
+
+    def _assign(self, segments, rows, df_adjust):
+        """Install segments and recompute the corpus-wide statistics over their live docs"""
+        self.segments = segments
+        self.rows = rows
+        self.df_adjust = df_adjust
+        self.N = sum(1 for seg_rows in rows for row in seg_rows if row != DELETED)
+        self.norms = []
+        self.terms = {}
+        self.term_maps = []
+        self.doc_freqs = array('I')
+        self.idf = array('d')
+        self.max_impact = array('d')
+        self._trigram_index = None
+        self._corrections = {}
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
+        total = sum(dl for seg, seg_rows in zip(segments, rows)
+                    for dl, row in zip(seg.doc_lengths(), seg_rows) if row != DELETED)
+        self.avgdl = total / self.N
+        if not total:
+            return  # no tokens at all, hence no postings to normalise
+        self.norms = [array('d', (self.k1 * (1 - self.b + self.b * dl / self.avgdl) for dl in seg.len_table))
+                      for seg in segments]
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+        terms = self.terms
+        for seg in segments:
+            term_map = array('I', bytes(4 * len(seg.vocab)))
+            for word, t in seg.vocab.items():
+                g = terms.get(word)
+                if g is None:
+                    g = terms[word] = len(terms)
+                term_map[t] = g
+            self.term_maps.append(term_map)
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        doc_freqs = [0] * len(terms)
+        for word, n in df_adjust.items():
+            g = terms.get(word)
+            if g is not None:
+                doc_freqs[g] += n
+        for seg, term_map in zip(segments, self.term_maps):
+            df = seg.df
+            for t, g in enumerate(term_map):
+                doc_freqs[g] += df[t]
+        self.doc_freqs = array('I', doc_freqs)
+        self.idf = array('d', (log((self.N - df + 0.5) / (df + 0.5) + 1) if df > 0 else 0.0 for df in doc_freqs))
 
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        idf = self.idf
+        max_impact = [0.0] * len(terms)
+        for seg, term_map in zip(segments, self.term_maps):
+            for t, g in enumerate(term_map):
+                if not doc_freqs[g]:
+                    continue
+                tf = seg.max_tf[t]
+                bound = idf[g] * (tf * (self.k1 + 1)) / (tf + self.k1 * (1 - self.b + self.b * seg.min_len[t] / self.avgdl))
+                if bound > max_impact[g]:
+                    max_impact[g] = bound
+        self.max_impact = array('d', max_impact)
+
+    def _impact(self, g, norm, tf):
+        """BM25 contribution of term id g to one document"""
+        return self.idf[g] * (tf * (self.k1 + 1)) / (tf + norm)
+
+    def term_id(self, token):
+        """Term id of a token occurring in a live document, or None"""
+        g = self.terms.get(token)
+        return g if g is not None and self.doc_freqs[g] else None
+
+    def _term_weights(self):
+        """{token: live document frequency}, the vocabulary typo correction draws from"""
+        doc_freqs = self.doc_freqs
+        return {token: doc_freqs[g] for token, g in self.terms.items() if doc_freqs[g]}
+
+    def _query_terms(self, query, known_word=None):
+        """
+        (token, term id) of query tokens present in the live corpus, in query order.
+
+        With FUZZY_MATCH, a token missing from this index is corrected to its
+        closest indexed word unless known_word(token) says it is a real word
+        found elsewhere (then it is dropped, like any unmatched token).
+        """
+        terms = []
+        for token in self.tokenize(query):
+            g = self.term_id(token)
+            if (g is None and FUZZY_MATCH and len(token) >= FUZZY_MIN_LENGTH
+                    and not (known_word and known_word(token))):
+                token = self.correct(token)
+                g = self.term_id(token)
+            if g is not None:
+                terms.append((token, g))
+        return terms
+
+    def correct(self, token):
+        """Closest indexed token to an unknown query token, or None (memoized, bounded, unless frozen)"""
+        corrections = self._corrections
+        if token in corrections:
+            return corrections[token]
+        if self._trigram_index is None:
+            self._trigram_index = TrigramIndex(self._term_weights())
+        corrected = self._trigram_index.correct(token)
+        if not self._frozen:
+            if len(corrections) >= self._MAX_CORRECTIONS:
+                corrections.clear()
+            corrections[token] = corrected
+        return corrected
+
+    def freeze(self):
+        """
+        Make the index safe to query from many threads without locks: build the
+        lazily created typo-correction index now and stop memoizing corrections
+        and mapped vocabulary lookups, so a query only reads shared state. Returns self.
+        """
+        if FUZZY_MATCH and self._trigram_index is None:
+            self._trigram_index = TrigramIndex(self._term_weights())
+        for seg in self.segments:
+            if isinstance(seg, MappedSegment):
+                seg.vocab.freeze()
+        self._frozen = True
+        return self
+
+    def thaw(self):
+        """Undo freeze(): memoize corrections and mapped lookups again. Returns self."""
+        for seg in self.segments:
+            if isinstance(seg, MappedSegment):
+                seg.vocab.thaw()
+        self._frozen = False
+        return self
+
+    def _postings(self, token, g):
+        """Yield (row, contribution) for every live document containing token (term id g)"""
+        idf, k1_plus = self.idf[g], self.k1 + 1
+        for seg, seg_rows, norms in zip(self.segments, self.rows, self.norms):
+            t = seg.vocab.get(token)
+            if t is None:
+                continue
+            codes = seg.len_codes
+            for docs, tfs in seg.blocks(t):
+                for local, tf in zip(docs, tfs):
+                    row = seg_rows[local]
+                    if row != DELETED:
+                        yield row, idf * (tf * k1_plus) / (tf + norms[codes[local]])
+
+    def _accumulate(self, query_terms):
+        """Sum BM25 contributions over the postings of each (token, term id) of a query"""
+        scores = {}
+        for token, g in query_terms:
+            for row, impact in self._postings(token, g):
+                scores[row] = scores.get(row, 0) + impact
+        return scores
+
+    def rank(self, query, known_word=None):
+        """Score only documents containing a query term, best first"""
+        scores = self._accumulate(self._query_terms(query, known_word))
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+
+    def top_k(self, query, k, known_word=None):
+        """
+        Best k documents with score > 0, identical to rank(query)[:k].
+
+        MaxScore pruning: query terms are ordered by their score upper bound and
+        the cheapest ones become non-essential once their combined bound cannot
+        beat the current k-th score. Only documents from essential postings are
+        visited, and a candidate is fully scored only if its bound can enter the heap.
+        """
+        if k <= 0:
+            return []
+        query_terms = self._query_terms(query, known_word)
+        if not query_terms:
+            return []
+
+        counts = {}
+        tokens = {}
+        for token, g in query_terms:
+            counts[g] = counts.get(g, 0) + 1
+            tokens[g] = token
+        max_impact = self.max_impact
+        terms = sorted(counts, key=lambda g: counts[g] * max_impact[g])
+        prefix_bounds = []
+        total = 0.0
+        for g in terms:
+            total += counts[g] * max_impact[g]
+            prefix_bounds.append(total)
+
+        heap = []  # (score, -row): heap[0] is the current k-th best
+        for s in range(len(self.segments)):
+            self._top_k_segment(s, query_terms, terms, tokens, counts, prefix_bounds, k, heap)
+        return [(-neg_row, score) for score, neg_row in sorted(heap, reverse=True)]
+
+    def _top_k_segment(self, s, query_terms, terms, tokens, counts, prefix_bounds, k, heap):
+        """MaxScore traversal of one segment (terms: ids by ascending bound), feeding the shared top-k heap"""
+        seg, seg_rows, norms, codes = self.segments[s], self.rows[s], self.norms[s], self.segments[s].len_codes
+        docs, tfs = [], []
+        for g in terms:
+            t = seg.vocab.get(tokens[g])
+            term_docs, term_tfs = seg.decode(t) if t is not None else ((), ())
+            docs.append(term_docs)
+            tfs.append(term_tfs)
+        pos = [0] * len(terms)
+        ends = [len(term_docs) for term_docs in docs]
+
+        m = len(terms)
+        first_essential = 0
+        if len(heap) == k:
+            while first_essential < m and prefix_bounds[first_essential] + _BOUND_SLACK < heap[0][0]:
+                first_essential += 1
+
+        while first_essential < m:
+            # Next candidate: smallest doc id under an essential cursor
+            cand = None
+            for i in range(first_essential, m):
+                if pos[i] < ends[i]:
+                    d = docs[i][pos[i]]
+                    if cand is None or d < cand:
+                        cand = d
+            if cand is None:
+                break
+
+            norm = norms[codes[cand]]
+            doc_tfs = {}
+            upper = prefix_bounds[first_essential - 1] if first_essential else 0.0
+            for i in range(first_essential, m):
+                if pos[i] < ends[i] and docs[i][pos[i]] == cand:
+                    tf = tfs[i][pos[i]]
+                    pos[i] += 1
+                    doc_tfs[terms[i]] = tf
+                    upper += counts[terms[i]] * self._impact(terms[i], norm, tf)
+            row = seg_rows[cand]
+            if row == DELETED or (len(heap) == k and upper + _BOUND_SLACK < heap[0][0]):
+                continue
+
+            # Probe the non-essential lists only for surviving candidates
+            for i in range(first_essential):
+                j = bisect_left(docs[i], cand, pos[i], ends[i])
+                pos[i] = j
+                if j < ends[i] and docs[i][j] == cand:
+                    doc_tfs[terms[i]] = tfs[i][j]
 
-        for idx, doc in enumerate(self.corpus):
+            # Exact score, summed in query order as _accumulate does
             score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+            for _, g in query_terms:
+                tf = doc_tfs.get(g)
+                if tf:
+                    score += self._impact(g, norm, tf)
+
+            entry = (score, -row)
+            if len(heap) < k:
+                heappush(heap, entry)
+            elif entry > heap[0]:
+                heapreplace(heap, entry)
+            else:
+                continue
+            if len(heap) == k:
+                while first_essential < m and prefix_bounds[first_essential] + _BOUND_SLACK < heap[0][0]:
+                    first_essential += 1
+
+    def top_k_many(self, queries, ks, known_word=None):
+        """top_k for a batch of queries sharing one postings pass"""
+        return [nsmallest(k, scores.items(), key=lambda x: (-x[1], x[0])) if k > 0 else []
+                for scores, k in zip(self.score_many(queries, known_word), ks)]
+
+    def score_many(self, queries, known_word=None):
+        """
+        {row: score} of the matching documents for each query in a batch.
+
+        Each distinct query term's postings are turned into precomputed
+        (row, contribution) lists once for the whole batch; every query then
+        only sums those lists, in its own token order.
+        """
+        batch = [self._query_terms(query, known_word) for query in queries]
+        impacts = {}
+        for query_terms in batch:
+            for token, g in query_terms:
+                if g not in impacts:
+                    impacts[g] = list(self._postings(token, g))
+
+        all_scores = []
+        for query_terms in batch:
+            scores = {}
+            for _, g in query_terms:
+                for row, impact in impacts[g]:
+                    scores[row] = scores.get(row, 0) + impact
+            all_scores.append(scores)
+        return all_scores
+
+    def score(self, query, known_word=None):
+        """Score all documents against query"""
+        scores = self._accumulate(self._query_terms(query, known_word))
+        return sorted(((row, scores.get(row, 0)) for row in range(self.N)), key=lambda x: x[1], reverse=True)
+
+    # ---- incremental maintenance ----
+    def with_delta(self, kept, removed_documents, added_documents):
+        """
+        New index for an edited corpus, without re-tokenizing unchanged rows.
+
+        kept: {old row: new row} for documents whose text is unchanged
+        removed_documents: old texts of rows that were deleted or changed
+        added_documents: [(new row, text)] for new or changed rows
+        """
+        rows = [array('i', (kept.get(row, DELETED) if row != DELETED else DELETED for row in seg_rows))
+                for seg_rows in self.rows]
+        df_adjust = dict(self.df_adjust)
+        for text in removed_documents:
+            for token in set(self.tokenize(text)):
+                df_adjust[token] = df_adjust.get(token, 0) - 1
+
+        segments = list(self.segments)
+        if added_documents:
+            segments.append(Segment.build([self.tokenize(text) for _, text in added_documents]))
+            rows.append(array('i', (row for row, _ in added_documents)))
+
+        index = BM25(self.k1, self.b, self.tokenizer)
+        index._assign(segments, rows, {token: n for token, n in df_adjust.items() if n})
+        masked = sum(1 for seg_rows in rows for row in seg_rows if row == DELETED)
+        delta = sum(len(seg.len_codes) for seg in segments[1:])
+        if masked + delta > DELTA_MERGE_RATIO * max(index.N, 1):
+            index = index.merged()
+        return index
+
+    def merged(self):
+        """Equivalent single-segment index, rebuilt from live postings (no re-tokenizing)"""
+        doc_lengths = array('I', [0]) * self.N
+        term_postings = {}
+        for seg, seg_rows in zip(self.segments, self.rows):
+            for local, dl in enumerate(seg.doc_lengths()):
+                if seg_rows[local] != DELETED:
+                    doc_lengths[seg_rows[local]] = dl
+            for word, t in seg.vocab.items():
+                live = [(seg_rows[local], tf) for local, tf in zip(*seg.decode(t)) if seg_rows[local] != DELETED]
+                if live:
+                    term_postings.setdefault(word, []).extend(live)
+
+        packed = {}
+        for word, plist in term_postings.items():
+            plist.sort()
+            packed[word] = (array('I', (row for row, _ in plist)), array('I', (tf for _, tf in plist)))
+        index = BM25(self.k1, self.b, self.tokenizer)
+        index._assign([Segment.from_postings(packed, doc_lengths)], [array('i', range(self.N))], {})
+        return index
+
+    def state(self):
+        """Plain-data snapshot of the fitted index (marshal-friendly)"""
+        return {"k1": self.k1, "b": self.b, "tokenizer": self.tokenizer.signature,
+                "segments": [seg.state() for seg in self.segments],
+                "rows": [seg_rows.tobytes() for seg_rows in self.rows],
+                "df_adjust": self.df_adjust}
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a fitted index from state() without re-tokenizing"""
+        bm25 = cls(state["k1"], state["b"], Tokenizer(*state["tokenizer"]))
+        rows = []
+        for raw in state["rows"]:
+            seg_rows = array('i')
+            seg_rows.frombytes(raw)
+            rows.append(seg_rows)
+        bm25._assign([Segment.from_state(seg) for seg in state["segments"]], rows, state["df_adjust"])
+        return bm25
+
+
+# ============ HASHED TF-IDF VECTORS ============
+def _vector_features(tokens, bits):
+    """
+    Hashed feature counts of a token list: every word, plus a 5-letter prefix
+    for longer words so inflections meet ("animate", "animations" -> "anima*").
+    """
+    mask = (1 << bits) - 1
+    counts = {}
+    for token in tokens:
+        h = zlib.crc32(token.encode("utf-8")) & mask
+        counts[h] = counts.get(h, 0) + 1
+        if len(token) >= 5:
+            h = zlib.crc32(f"{token[:5]}*".encode("utf-8")) & mask
+            counts[h] = counts.get(h, 0) + 1
+    return counts
+
+
+class VectorIndex:
+    """
+    L2-normalised TF-IDF document vectors over a hashed feature space.
+
+    Stored transposed (feature -> postings of (row, weight)) in CSR arrays, so
+    scoring a batch of sparse query vectors is one pass over the postings of
+    the features the batch uses: the sparse matrix product Q . D^T.
+    """
+
+    _ARRAYS = ("offsets", "post_docs", "post_weights", "idf")
+
+    def __init__(self, bits=VECTOR_HASH_BITS):
+        self.bits = bits
+        self.slots = {}  # hashed feature -> slot in offsets/idf
+        self.offsets = array('I', [0])
+        self.post_docs = array('I')
+        self.post_weights = array('d')
+        self.idf = array('d')
+        self.N = 0
+
+    def fit(self, token_lists):
+        """Build normalised vectors for tokenized documents; rows follow input order"""
+        doc_features = [_vector_features(tokens, self.bits) for tokens in token_lists]
+        self.N = len(doc_features)
+        df = {}
+        for features in doc_features:
+            for h in features:
+                df[h] = df.get(h, 0) + 1
+        idf = {h: log((self.N + 1) / (n + 1)) + 1 for h, n in df.items()}
+
+        postings = {}
+        for row, features in enumerate(doc_features):
+            weights = {h: (1 + log(tf)) * idf[h] for h, tf in features.items()}
+            norm = sum(w * w for w in weights.values()) ** 0.5
+            for h, w in weights.items():
+                plist = postings.get(h)
+                if plist is None:
+                    plist = postings[h] = (array('I'), array('d'))
+                plist[0].append(row)
+                plist[1].append(w / norm)
+
+        for h, (docs, weights) in postings.items():
+            self.slots[h] = len(self.slots)
+            self.post_docs.extend(docs)
+            self.post_weights.extend(weights)
+            self.offsets.append(len(self.post_docs))
+            self.idf.append(idf[h])
+
+    def query_vector(self, tokens):
+        """Normalised [(slot, weight)] of a tokenized query, features unseen in the corpus dropped"""
+        weights = []
+        for h, tf in _vector_features(tokens, self.bits).items():
+            slot = self.slots.get(h)
+            if slot is not None:
+                weights.append((slot, (1 + log(tf)) * self.idf[slot]))
+        norm = sum(w * w for _, w in weights) ** 0.5
+        return [(slot, w / norm) for slot, w in weights] if norm else []
+
+    def cosine_many(self, token_lists):
+        """{row: cosine similarity} of the matching documents for each tokenized query"""
+        vectors = [self.query_vector(tokens) for tokens in token_lists]
+        columns = {}
+        for vector in vectors:
+            for slot, _ in vector:
+                if slot not in columns:
+                    start, end = self.offsets[slot], self.offsets[slot + 1]
+                    columns[slot] = list(zip(self.post_docs[start:end], self.post_weights[start:end]))
+
+        all_scores = []
+        for vector in vectors:
+            scores = {}
+            for slot, q in vector:
+                for row, w in columns[slot]:
+                    scores[row] = scores.get(row, 0.0) + q * w
+            all_scores.append(scores)
+        return all_scores
+
+    def state(self):
+        """Plain-data snapshot (marshal-friendly; arrays as raw bytes)"""
+        state = {"bits": self.bits, "N": self.N, "slots": list(self.slots)}
+        for name in self._ARRAYS:
+            arr = getattr(self, name)
+            state[name] = (arr.typecode, arr.tobytes())
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls(state["bits"])
+        index.N = state["N"]
+        index.slots = {h: slot for slot, h in enumerate(state["slots"])}
+        for name in cls._ARRAYS:
+            typecode, raw = state[name]
+            arr = array(typecode)
+            arr.frombytes(raw)
+            setattr(index, name, arr)
+        return index
+
+
+def hybrid_top_k_many(bm25, vectors, queries, ks, bm25_weight=None, known_word=None):
+    """
+    Best k rows per query by fused score: bm25_weight * BM25 / (query's best
+    BM25) + (1 - bm25_weight) * cosine. Both signals lie in [0, 1], so long
+    natural-language prompts that share few exact terms still match on
+    vector overlap. Ties break by row.
+    """
+    weight = HYBRID_BM25_WEIGHT if bm25_weight is None else bm25_weight
+    bm25_scores = bm25.score_many(queries, known_word)
+    cosines = vectors.cosine_many([bm25.tokenize(query) for query in queries])
+    ranked = []
+    for scores, cos, k in zip(bm25_scores, cosines, ks):
+        top = max(scores.values(), default=0)
+        fused = {}
+        for row, score in scores.items():
+            fused[row] = weight * score / top
+        for row, sim in cos.items():
+            fused[row] = fused.get(row, 0.0) + (1 - weight) * sim
+        hits = [(row, score) for row, score in fused.items() if score > 0]
+        ranked.append(nsmallest(k, hits, key=lambda x: (-x[1], x[0])) if k > 0 else [])
+    return ranked
+
+
+# ============ MULTI-PATTERN MATCHER ============
+class AhoCorasick:
+    """Aho-Corasick automaton: reports every pattern occurring in a text in one pass"""
+
+    def __init__(self, patterns):
+        """patterns: iterable of (pattern, value); an empty pattern matches every text"""
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self.always = []
+        for pattern, value in patterns:
+            if not pattern:
+                self.always.append(value)
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(value)
+
+        # Breadth-first failure links; each node also reports its suffix matches
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def iter(self, text):
+        """Yield the value of every pattern occurrence in text"""
+        yield from self.always
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                yield from out[node]
+
+    def matches(self, text):
+        """Set of values whose pattern occurs in text"""
+        return set(self.iter(text))
+
+
+# ============ COLUMN STORE ============
+class ColumnStore:
+    """
+    Read-only CSV table stored column by column.
+
+    Each column is one concatenated string plus an array of row offsets, so a
+    loaded file costs a handful of objects instead of a dict and a string per
+    cell. Cells are sliced out on demand: indexing reads only the search
+    columns and rows are materialized only for the hits that are returned.
+    Mirrors csv.DictReader: blank lines are skipped and short rows read as None.
+    """
+
+    def __init__(self, fieldnames, n_rows, columns):
+        self.fieldnames = fieldnames
+        self.n_rows = n_rows
+        self.columns = columns  # name -> (text, array('I') offsets, frozenset of None rows)
+
+    @classmethod
+    def from_csv(cls, filepath):
+        import csv
+        with open(filepath, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            fieldnames = next(reader, [])
+            # Later duplicate headers win, as in DictReader
+            positions = {name: i for i, name in enumerate(fieldnames)}
+            parts = {name: [] for name in positions}
+            nulls = {name: [] for name in positions}
+            n_rows = 0
+            for record in reader:
+                if not record:
+                    continue
+                for name, i in positions.items():
+                    if i < len(record):
+                        parts[name].append(record[i])
+                    else:
+                        parts[name].append("")
+                        nulls[name].append(n_rows)
+                n_rows += 1
+
+        columns = {}
+        for name, cells in parts.items():
+            offsets = array('I', [0])
+            end = 0
+            for cell in cells:
+                end += len(cell)
+                offsets.append(end)
+            columns[name] = ("".join(cells), offsets, frozenset(nulls[name]))
+        return cls(fieldnames, n_rows, columns)
+
+    def __len__(self):
+        return self.n_rows
+
+    def cell(self, col, idx):
+        """Value of one cell (None where the row was too short)"""
+        text, offsets, nulls = self.columns[col]
+        if idx in nulls:
+            return None
+        return text[offsets[idx]:offsets[idx + 1]]
+
+    def row(self, idx, cols):
+        """Dict of the requested columns present in the file, for one row"""
+        return {col: self.cell(col, idx) for col in cols if col in self.columns}
+
+    def documents(self, search_cols):
+        """Search text per row: the search columns joined by spaces (missing columns are empty)"""
+        cols = [col if col in self.columns else None for col in search_cols]
+        return [" ".join(str(self.cell(col, idx)) if col else "" for col in cols) for idx in range(self.n_rows)]
+
+    def state(self):
+        """Plain-data snapshot (marshal-friendly)"""
+        return {"fieldnames": self.fieldnames, "n_rows": self.n_rows,
+                "columns": {name: (text, offsets.tobytes(), tuple(nulls))
+                            for name, (text, offsets, nulls) in self.columns.items()}}
+
+    @classmethod
+    def from_state(cls, state):
+        columns = {}
+        for name, (text, raw, nulls) in state["columns"].items():
+            offsets = array('I')
+            offsets.frombytes(raw)
+            columns[name] = (text, offsets, frozenset(nulls))
+        return cls(state["fieldnames"], state["n_rows"], columns)
+
+
+class StackedStore:
+    """Rows of several ColumnStores one after another: a data file followed by its overlays"""
+
+    def __init__(self, stores, starts):
+        self.stores = stores
+        self.starts = starts  # first row of each store
+        self.fieldnames = stores[0].fieldnames
+        self.n_rows = sum(len(store) for store in stores)
+
+    def __len__(self):
+        return self.n_rows
+
+    def _locate(self, idx):
+        i = bisect_right(self.starts, idx) - 1
+        return self.stores[i], idx - self.starts[i]
+
+    def cell(self, col, idx):
+        store, local = self._locate(idx)
+        return store.cell(col, local) if col in store.columns else None
+
+    def row(self, idx, cols):
+        """Dict of the requested columns present in the row's own file"""
+        store, local = self._locate(idx)
+        return store.row(local, cols)
+
+    def documents(self, search_cols):
+        return [doc for store in self.stores for doc in store.documents(search_cols)]
+
+
+# ============ SHARED MEMORY INDEX ============
+_SHARED_MAGIC = b"UIPXMAP\0"
+
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+class MappedVocab:
+    """
+    Read-only token -> term id table over a mapped string table.
 
-            scores.append((idx, score))
+    Tokens are stored UTF-8 encoded in byte order, so a lookup is a binary search
+    over the mapping. Resolved query tokens are remembered (bounded) unless frozen.
+    """
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    _MAX_LOOKUPS = 65536
+
+    def __init__(self, blob, offsets):
+        self.blob = blob          # memoryview of the concatenated tokens
+        self.offsets = offsets    # memoryview 'I': token t is blob[offsets[t]:offsets[t + 1]]
+        self._lookups = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _raw(self, t):
+        return bytes(self.blob[self.offsets[t]:self.offsets[t + 1]])
+
+    def get(self, token, default=None):
+        if not isinstance(token, str):
+            return default  # e.g. a failed typo correction (None)
+        lookups = self._lookups
+        t = lookups.get(token, -1) if lookups is not None else -1
+        if t == -1:
+            key = token.encode('utf-8')
+            lo, hi = 0, len(self)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._raw(mid) < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            t = lo if lo < len(self) and self._raw(lo) == key else None
+            if lookups is not None:
+                if len(lookups) >= self._MAX_LOOKUPS:
+                    lookups.clear()
+                lookups[token] = t
+        return default if t is None else t
+
+    def freeze(self):
+        """Stop remembering lookups, so get() only reads (see BM25.freeze)"""
+        self._lookups = None
+
+    def thaw(self):
+        self._lookups = {}
+
+    def __contains__(self, token):
+        return self.get(token) is not None
+
+    def __iter__(self):
+        return (str(self._raw(t), 'utf-8') for t in range(len(self)))
+
+    def items(self):
+        return ((str(self._raw(t), 'utf-8'), t) for t in range(len(self)))
+
+
+class MappedSegment(Segment):
+    """Segment whose vocabulary, postings and length codes are views into a mapped file"""
+
+    def __init__(self, vocab, fields):
+        self.vocab = vocab
+        for name in Segment._ARRAYS + Segment._BYTES:
+            setattr(self, name, fields[name])
+
+
+class MappedColumnStore(ColumnStore):
+    """ColumnStore over mapped UTF-8 column bytes (byte offsets); cells are decoded on access"""
+
+    def cell(self, col, idx):
+        raw, offsets, nulls = self.columns[col]
+        if idx in nulls:
+            return None
+        return str(raw[offsets[idx]:offsets[idx + 1]], 'utf-8')
+
+
+# ============ QUERY RESULT CACHE ============
+class QueryCache:
+    """
+    Size-bounded LRU of search results, keyed by a normalized query.
+
+    Every entry remembers the data file fingerprint it was computed from and is
+    dropped on lookup once the file changes. With a path, entries are loaded from
+    disk on first use and merged back at exit, so separate CLI processes share
+    them; the file is tied to the cache version and to this module's mtime.
+    """
+
+    def __init__(self, size, path=None):
+        import threading
+        self.size = size
+        self.path = path
+        self.entries = OrderedDict()  # key -> (fingerprint, results)
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self._lock = threading.Lock()
+        self._loaded = path is None
+        self._dirty = False
+
+    def _tag(self):
+        return (_INDEX_CACHE_VERSION, sys.version_info[:2], _file_fingerprint(Path(__file__)))
+
+    def _read_disk(self):
+        try:
+            tag, entries = marshal.loads(self.path.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return []
+        return entries if tag == self._tag() else []
+
+    def _load(self):
+        self._loaded = True
+        for key, fingerprint, results in self._read_disk():
+            self.entries[key] = (fingerprint, results)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def get(self, key, fingerprint):
+        """Copy of the cached results, or None (a stale entry counts as a miss and is dropped)"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] != fingerprint:
+                del self.entries[key]
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return [dict(row) for row in entry[1]]
+
+    def put(self, key, fingerprint, results):
+        with self._lock:
+            self.entries[key] = (fingerprint, [dict(row) for row in results])
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            if self.path is not None and not self._dirty:
+                import atexit
+                atexit.register(self.flush)
+            self._dirty = True
+
+    def flush(self):
+        """Merge this process's entries into the disk file (newest last, trimmed to size)"""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            merged = OrderedDict((key, (fingerprint, results)) for key, fingerprint, results in self._read_disk())
+            for key, entry in self.entries.items():
+                merged.pop(key, None)
+                merged[key] = entry
+            entries = [(key, fingerprint, results) for key, (fingerprint, results) in merged.items()]
+            _write_cache_file(self.path, (self._tag(), entries[-self.size:]))
+            self._dirty = False
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "invalidations": self.invalidations, "size": len(self.entries), "capacity": self.size}
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
 
 
 # ============ SEARCH FUNCTIONS ============
+# (filepath, search_cols) -> (file fingerprint, content digest, ColumnStore, BM25 index); built once per process
+_INDEXES = {}
+_VECTORS = {}  # same keys -> (content digest, VectorIndex); built on first hybrid search
+_DOMAIN_MATCHER = None
+_MERGED = {}  # name -> ([(label, BM25)], merged BM25, first row of each part); see _merged_index
+_QUERY_CACHE = None
+_VOCABULARY = None  # (key, frozenset of every indexed token); see _global_vocabulary
+_FROZEN = 0  # freeze_indexes() calls not yet undone by thaw_indexes(): serve the loaded indexes as they are
+
+
 def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+    """Load CSV into a ColumnStore"""
+    return ColumnStore.from_csv(filepath)
+
+
+def _file_fingerprint(filepath):
+    """Cheap change detector for a data file"""
+    stat = filepath.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _file_digest(filepath):
+    """Content hash of a data file, used when mtime/size no longer match"""
+    import hashlib
+    return hashlib.sha1(filepath.read_bytes()).hexdigest()
+
+
+def find_overlay_dirs(explicit=None):
+    """
+    Overlay directories to search: explicit paths if any, else $UIPRO_OVERLAY
+    (os.pathsep-separated), else ./design-system/data when it exists.
+    """
+    if explicit:
+        candidates = list(explicit)
+    elif os.environ.get("UIPRO_OVERLAY"):
+        candidates = [p for p in os.environ["UIPRO_OVERLAY"].split(os.pathsep) if p]
+    else:
+        candidates = [Path("design-system") / "data"]
+    return [Path(p).resolve() for p in candidates if Path(p).is_dir()]
+
+
+def _known_word(token):
+    """True when some domain or stack index (or one of its overlays) contains token; BM25's known_word"""
+    return token in _global_vocabulary()
+
+
+def _overlay_files(filepath):
+    """Overlay CSVs of a data file that exist, in OVERLAY_DIRS order"""
+    if not OVERLAY_DIRS:
+        return []
+    try:
+        relative = Path(filepath).relative_to(DATA_DIR)
+    except ValueError:
+        return []
+    return [path for path in (Path(d) / relative for d in OVERLAY_DIRS) if path.is_file()]
+
+
+# ============ ON-DISK INDEX CACHE ============
+def _cache_path(filepath, search_cols):
+    """Cache entry for a (file, search columns) pair inside INDEX_CACHE_DIR"""
+    key = "\0".join([str(Path(filepath).resolve())] + list(search_cols))
+    return INDEX_CACHE_DIR / f"{Path(filepath).stem}-{zlib.crc32(key.encode('utf-8')):08x}.idx"
+
+
+def _read_cached_index(filepath, search_cols):
+    """
+    Load (fingerprint, digest, ColumnStore, BM25) from the on-disk cache with a single read.
+
+    The entry may be stale; the caller compares fingerprints and patches it.
+    Returns None when missing or written by an incompatible version/tokenizer.
+    """
+    if INDEX_CACHE_DIR is None:
+        return None
+    path = _cache_path(filepath, search_cols)
+    try:
+        entry = marshal.loads(path.read_bytes())
+        version, python_tag, fingerprint, digest, cols, data, state = entry
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != _INDEX_CACHE_VERSION or python_tag != sys.version_info[:2] or cols != tuple(search_cols):
+        return None
+    if tuple(state["tokenizer"]) != Tokenizer().signature:
+        return None
+    return fingerprint, digest, ColumnStore.from_state(data), BM25.from_state(state)
+
+
+def _write_cached_index(filepath, search_cols, fingerprint, digest, data, state):
+    """Atomically write a cache entry; a read-only skill directory just means no cache"""
+    if INDEX_CACHE_DIR is None:
+        return
+    entry = (_INDEX_CACHE_VERSION, sys.version_info[:2], fingerprint, digest, tuple(search_cols), data.state(), state)
+    _write_cache_file(_cache_path(filepath, search_cols), entry)
+
+
+def _write_cache_file(path, entry):
+    """Marshal entry to path through a per-thread temp file and an atomic rename; errors are ignored"""
+    _write_bytes_atomic(path, marshal.dumps(entry))
+
+
+def _write_bytes_atomic(path, payload, ignore_errors=True):
+    """Write payload through a per-thread temp file and an atomic rename; True if written (OSError re-raised unless ignore_errors)"""
+    import threading
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        if not ignore_errors:
+            raise
+        return False
+    return True
+
+
+def _shared_path(filepath, search_cols):
+    """Flat mappable snapshot next to the marshal cache entry"""
+    return _cache_path(filepath, search_cols).with_suffix(".map")
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _write_shared_index(filepath, search_cols, fingerprint, digest, data, bm25):
+    """
+    Publish (data, bm25) as one flat, native-endian file for _attach_shared_index.
+
+    Layout: magic, metadata length, marshalled metadata (scalars, null rows and
+    the byte range of every section), then 8-byte aligned raw sections: the
+    byte-sorted vocabulary, the block-coded postings with their per-term arrays,
+    length codes and the norm per code, IDF, score bounds and each column's
+    UTF-8 text with byte offsets. Multi-segment (delta) indexes are merged first.
+    """
+    if INDEX_CACHE_DIR is None:
+        return
+    if len(bm25.segments) != 1 or bm25.df_adjust or any(row != i for i, row in enumerate(bm25.rows[0])):
+        bm25 = bm25.merged()
+    seg = bm25.segments[0]
+
+    blob, postings = bytearray(), bytearray()
+    sections = {name: array('I') for name in ("vocab_offsets", "offsets", "df", "max_tf", "min_len")}
+    sections["vocab_offsets"].append(0)
+    sections["offsets"].append(0)
+    idf, max_impact = array('d'), array('d')
+    for word in sorted(seg.vocab, key=lambda w: w.encode('utf-8')):
+        t = seg.vocab[word]
+        blob += word.encode('utf-8')
+        sections["vocab_offsets"].append(len(blob))
+        # A term's blocks do not depend on its id: copied as they are
+        postings += seg.postings[seg.offsets[t]:seg.offsets[t + 1]]
+        sections["offsets"].append(len(postings))
+        sections["df"].append(seg.df[t])
+        sections["max_tf"].append(seg.max_tf[t])
+        sections["min_len"].append(seg.min_len[t])
+        g = bm25.terms[word]
+        idf.append(bm25.idf[g])
+        max_impact.append(bm25.max_impact[g])
+    for name in ("df", "max_tf", "min_len"):
+        sections[name] = _narrow(sections[name])
+    sections["vocab"] = blob
+    sections["postings"] = postings
+    sections["len_codes"] = seg.len_codes
+    sections["len_table"] = seg.len_table
+    sections["norms"] = bm25.norms[0] if bm25.norms else array('d', bytes(8 * len(seg.len_table)))
+    sections["idf"] = idf
+    sections["max_impact"] = max_impact
+
+    columns = []
+    for name, (_, _, nulls) in data.columns.items():
+        raw = bytearray()
+        offsets = array('I', [0])
+        for idx in range(len(data)):
+            raw += (data.cell(name, idx) or "").encode('utf-8')
+            offsets.append(len(raw))
+        sections[f"col:{name}"] = raw
+        sections[f"col_offsets:{name}"] = offsets
+        columns.append((name, tuple(sorted(nulls))))
+
+    layout = {}
+    body = bytearray()
+    for name, values in sections.items():
+        body += bytes(_align(len(body)) - len(body))
+        layout[name] = (len(body), len(values) * getattr(values, "itemsize", 1),
+                        getattr(values, "typecode", "B"))
+        body += values
+    meta = marshal.dumps({
+        "version": _INDEX_CACHE_VERSION, "python": sys.version_info[:2], "byteorder": sys.byteorder,
+        "fingerprint": fingerprint, "digest": digest, "search_cols": tuple(search_cols),
+        "tokenizer": bm25.tokenizer.signature, "k1": bm25.k1, "b": bm25.b, "N": bm25.N, "avgdl": bm25.avgdl,
+        "fieldnames": data.fieldnames, "n_rows": len(data), "columns": columns, "sections": layout})
+    header = _SHARED_MAGIC + len(meta).to_bytes(8, 'little') + meta
+    _write_bytes_atomic(_shared_path(filepath, search_cols),
+                        header + bytes(_align(len(header)) - len(header)) + body)
+
+
+def _attach_shared_index(filepath, search_cols):
+    """
+    Map a published snapshot read-only: (fingerprint, digest, MappedColumnStore, BM25).
+
+    Nothing is copied; the BM25 reads postings and statistics straight from the
+    mapping, so extra processes add only a few small objects. Returns None when
+    missing or written by an incompatible version, platform or tokenizer.
+    """
+    if INDEX_CACHE_DIR is None:
+        return None
+    import mmap
+    try:
+        with open(_shared_path(filepath, search_cols), 'rb') as f:
+            view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        if view[:len(_SHARED_MAGIC)] != _SHARED_MAGIC:
+            return None
+        size = int.from_bytes(view[len(_SHARED_MAGIC):len(_SHARED_MAGIC) + 8], 'little')
+        start = len(_SHARED_MAGIC) + 8
+        meta = marshal.loads(view[start:start + size])
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (meta.get("version"), meta.get("python"), meta.get("byteorder"), meta.get("search_cols")) != \
+            (_INDEX_CACHE_VERSION, sys.version_info[:2], sys.byteorder, tuple(search_cols)):
+        return None
+    if tuple(meta["tokenizer"]) != Tokenizer().signature:
+        return None
+
+    base = _align(start + size)
+
+    def section(name):
+        offset, nbytes, typecode = meta["sections"][name]
+        return view[base + offset:base + offset + nbytes].cast(typecode)
+
+    columns = {name: (section(f"col:{name}"), section(f"col_offsets:{name}"), frozenset(nulls))
+               for name, nulls in meta["columns"]}
+    data = MappedColumnStore(meta["fieldnames"], meta["n_rows"], columns)
+
+    bm25 = BM25(meta["k1"], meta["b"], Tokenizer(*meta["tokenizer"]))
+    vocab = MappedVocab(section("vocab"), section("vocab_offsets"))
+    bm25.segments = [MappedSegment(vocab, {name: section(name) for name in Segment._ARRAYS + Segment._BYTES})]
+    bm25.rows = [range(meta["N"])]
+    bm25.norms = [section("norms")]
+    # One compacted segment: its term ids are the index's and posting counts are the document frequencies
+    bm25.terms = vocab
+    bm25.term_maps = [range(len(vocab))]
+    bm25.doc_freqs = section("df")
+    bm25.idf = section("idf")
+    bm25.max_impact = section("max_impact")
+    bm25.N = meta["N"]
+    bm25.avgdl = meta["avgdl"]
+    return meta["fingerprint"], meta["digest"], data, bm25
+
+
+def _apply_row_delta(old_data, bm25, data, search_cols):
+    """
+    Patch an index for an edited CSV: rows whose search text is unchanged keep
+    their postings (matched by text, in order), everything else is a delta.
+    """
+    old_documents = old_data.documents(search_cols)
+    documents = data.documents(search_cols)
+    pool = {}
+    for i, doc in enumerate(old_documents):
+        pool.setdefault(doc, deque()).append(i)
+
+    kept = {}
+    added = []
+    for j, doc in enumerate(documents):
+        candidates = pool.get(doc)
+        if candidates:
+            kept[candidates.popleft()] = j
+        else:
+            added.append((j, doc))
+    removed = [old_documents[i] for candidates in pool.values() for i in candidates]
+
+    if not added and not removed and all(i == j for i, j in kept.items()):
+        return bm25  # only output columns changed
+    return bm25.with_delta(kept, removed, added)
+
+
+def _get_index(filepath, search_cols):
+    """Return (ColumnStore, BM25) for a CSV, reusing the prebuilt index until the file changes"""
+    key = (str(filepath), tuple(search_cols))
+    if _FROZEN:
+        cached = _INDEXES.get(key)
+        if cached is not None:
+            return cached[2], cached[3]
+    fingerprint = _file_fingerprint(filepath)
+    cached = _INDEXES.get(key)
+    if cached is None and SHARED_INDEX:
+        with profile_stage("shared index attach", file=filepath.name):
+            cached = _attach_shared_index(filepath, search_cols)
+    if cached is not None and cached[0] == fingerprint:
+        _INDEXES[key] = cached
+        return cached[2], cached[3]
+    if cached is None or isinstance(cached[2], MappedColumnStore):
+        # A mapped snapshot is compacted and read-only; deltas patch the marshal entry
+        with profile_stage("index cache read", file=filepath.name):
+            cached = _read_cached_index(filepath, search_cols)
+
+    if cached is not None and cached[0] == fingerprint:
+        digest, data, bm25 = cached[1:]
+    else:
+        digest = _file_digest(filepath)
+        if cached is not None and cached[1] == digest:
+            # Touched but unchanged (git checkout, copy)
+            data, bm25 = cached[2], cached[3]
+        else:
+            with profile_stage("CSV load", file=filepath.name):
+                data = _load_csv(filepath)
+            if cached is not None:
+                with profile_stage("BM25.with_delta", file=filepath.name):
+                    bm25 = _apply_row_delta(cached[2], cached[3], data, search_cols)
+            else:
+                bm25 = BM25()
+                bm25.fit(data.documents(search_cols))
+        with profile_stage("index cache write", file=filepath.name):
+            _write_cached_index(filepath, search_cols, fingerprint, digest, data, bm25.state())
+
+    entry = (fingerprint, digest, data, bm25)
+    if SHARED_INDEX:
+        with profile_stage("shared index write", file=filepath.name):
+            _write_shared_index(filepath, search_cols, *entry)
+            attached = _attach_shared_index(filepath, search_cols)
+        # Publishing can fail (read-only or full cache dir, a mapped file on Windows); an older map stays behind
+        if attached is not None and attached[0] == fingerprint:
+            entry = attached
+    _INDEXES[key] = entry
+    return entry[2], entry[3]
+
+
+def _get_data_index(filepath, search_cols):
+    """
+    (rows, BM25) of a data file together with its overlay files.
+
+    Every file is indexed and cached on its own; overlays are stacked after the
+    base rows and their segments merged with the base index (shared N, average
+    length and IDF, no re-tokenizing). Without overlays this is _get_index.
+    """
+    data, bm25 = _get_index(filepath, search_cols)
+    overlays = _overlay_files(filepath)
+    if not overlays:
+        return data, bm25
+    stores, parts = [data], [(str(filepath), bm25)]
+    for path in overlays:
+        overlay_data, overlay_bm25 = _get_index(path, search_cols)
+        stores.append(overlay_data)
+        parts.append((str(path), overlay_bm25))
+    merged, starts = _merged_index(("overlay", str(filepath), tuple(search_cols)), parts)
+    return StackedStore(stores, starts), merged
+
+
+def _get_vectors(filepath, search_cols):
+    """Return (ColumnStore, BM25, VectorIndex) for a CSV; vectors follow the same rows and cache"""
+    overlays = _overlay_files(filepath)
+    if overlays:
+        return _get_overlay_vectors(filepath, search_cols, overlays)
+    data, bm25 = _get_index(filepath, search_cols)
+    key = (str(filepath), tuple(search_cols))
+    digest = _INDEXES.get(key, (None, None))[1]
+    cached = _VECTORS.get(key)
+    if cached is not None and cached[0] == digest:
+        return data, bm25, cached[1]
+
+    path = _cache_path(filepath, search_cols).with_suffix(".vec") if INDEX_CACHE_DIR is not None else None
+    tag = (_INDEX_CACHE_VERSION, sys.version_info[:2], digest, Tokenizer().signature, VECTOR_HASH_BITS)
+    vectors = None
+    if path is not None:
+        with profile_stage("vector cache read", file=filepath.name):
+            try:
+                entry_tag, state = marshal.loads(path.read_bytes())
+                if entry_tag == tag:
+                    vectors = VectorIndex.from_state(state)
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+    if vectors is None:
+        with profile_stage("VectorIndex.fit", file=filepath.name):
+            vectors = VectorIndex()
+            vectors.fit([bm25.tokenize(doc) for doc in data.documents(search_cols)])
+        if path is not None:
+            _write_cache_file(path, (tag, vectors.state()))
 
+    _VECTORS[key] = (digest, vectors)
+    return data, bm25, vectors
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
+
+def _get_overlay_vectors(filepath, search_cols, overlays):
+    """
+    _get_vectors for a file with overlays. TF-IDF weights are corpus-wide and baked
+    into the normalised vectors, so these are fitted over all rows, in memory only.
+    """
+    data, bm25 = _get_data_index(filepath, search_cols)
+    files = [filepath] + overlays
+    key = tuple(str(path) for path in files) + tuple(search_cols)
+    digest = tuple(_INDEXES[(str(path), tuple(search_cols))][1] for path in files)
+    cached = _VECTORS.get(key)
+    if cached is None or cached[0] != digest:
+        with profile_stage("VectorIndex.fit", file=filepath.name, overlays=len(overlays)):
+            vectors = VectorIndex()
+            vectors.fit([bm25.tokenize(doc) for doc in data.documents(search_cols)])
+        cached = _VECTORS[key] = (digest, vectors)
+    return data, bm25, cached[1]
+
+
+def clear_index_cache():
+    """Drop every in-process index (they are reloaded lazily on next search) and unfreeze"""
+    global _FROZEN, _VOCABULARY
+    _FROZEN = 0
+    _VOCABULARY = None
+    _INDEXES.clear()
+    _VECTORS.clear()
+    _MERGED.clear()
+
+
+def query_cache_stats():
+    """Hit/miss counters of the query result cache (None when disabled)"""
+    cache = _query_cache()
+    return cache.stats() if cache is not None else None
+
+
+def clear_query_cache():
+    """Forget every cached result in this process and reset the counters"""
+    cache = _query_cache()
+    if cache is not None:
+        cache.clear()
+
+
+def build_index_cache(vectors=False):
+    """Compile the on-disk index (and TF-IDF vectors if asked) for every domain and stack file and its overlays; returns the files indexed"""
+    built = []
+    targets = [(cfg["file"], cfg["search_cols"]) for cfg in CSV_CONFIG.values()]
+    targets += [(cfg["file"], _STACK_COLS["search_cols"]) for cfg in STACK_CONFIG.values()]
+    for filename, search_cols in targets:
+        filepath = DATA_DIR / filename
+        if filepath.exists():
+            if vectors:
+                _get_vectors(filepath, search_cols)
+            else:
+                _get_data_index(filepath, search_cols)
+            built.append(filename)
+    _global_vocabulary()
+    return built
+
+
+def _vocabulary_sources():
+    """(path, search columns) of every domain and stack file, and each overlay of one, that exists"""
+    sources = []
+    for config in list(CSV_CONFIG.values()) + list(STACK_CONFIG.values()):
+        search_cols = config.get("search_cols", _STACK_COLS["search_cols"])
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            sources += [(path, search_cols) for path in [filepath] + _overlay_files(filepath)]
+    return sources
+
+
+def _global_vocabulary():
+    """
+    Every token some domain or stack index contains (overlays included).
+
+    Built once from the indexes and kept in INDEX_CACHE_DIR/vocabulary.bin,
+    keyed by the source files' fingerprints, so telling a real word from a typo
+    costs one stat per data file rather than loading every index.
+    """
+    global _VOCABULARY
+    cached = _VOCABULARY
+    if cached is not None and _FROZEN:
+        return cached[1]
+    sources = _vocabulary_sources()
+    key = (_INDEX_CACHE_VERSION, sys.version_info[:2], Tokenizer().signature,
+           tuple((str(path), tuple(cols), _file_fingerprint(path)) for path, cols in sources))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    path = INDEX_CACHE_DIR / "vocabulary.bin" if INDEX_CACHE_DIR is not None else None
+    words = None
+    if path is not None:
+        try:
+            stored_key, stored = marshal.loads(path.read_bytes())
+            if stored_key == key:
+                words = frozenset(stored)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+    if words is None:
+        with profile_stage("global vocabulary build"):
+            words = set()
+            for source, search_cols in sources:
+                words.update(_get_index(source, search_cols)[1]._term_weights())
+            words = frozenset(words)
+        if path is not None:
+            _write_bytes_atomic(path, marshal.dumps((key, sorted(words))))
+    _VOCABULARY = (key, words)
+    return words
+
+
+def _search_csv(filepath, search_cols, output_cols, query, max_results, mode=None):
+    """Core search function using BM25 (or hybrid BM25 + TF-IDF ranking, see RETRIEVAL_MODE)"""
     if not filepath.exists():
         return []
+    if (mode or RETRIEVAL_MODE) == "hybrid":
+        return _search_csv_many(filepath, search_cols, output_cols, [query], [max_results], mode)[0]
 
-    data = _load_csv(filepath)
+    def rank(queries, ks):
+        data, bm25 = _get_data_index(filepath, search_cols)
+        with profile_stage("score", file=filepath.name):
+            ranked = bm25.top_k(queries[0], ks[0], _known_word)
+        with profile_stage("materialize"):
+            return [_project(data, ranked, output_cols)]
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    return _through_query_cache(filepath, search_cols, output_cols, [query], [max_results], mode, rank)[0]
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+def _search_csv_many(filepath, search_cols, output_cols, queries, max_results, mode=None):
+    """Batch form of _search_csv: one index lookup and one postings pass for all queries"""
+    if not filepath.exists():
+        return [[] for _ in queries]
+
+    def rank(queries, ks):
+        if (mode or RETRIEVAL_MODE) == "hybrid":
+            data, bm25, vectors = _get_vectors(filepath, search_cols)
+            with profile_stage("score (hybrid)", file=filepath.name, queries=len(queries)):
+                batch = hybrid_top_k_many(bm25, vectors, queries, ks, known_word=_known_word)
+        else:
+            data, bm25 = _get_data_index(filepath, search_cols)
+            with profile_stage("score", file=filepath.name, queries=len(queries)):
+                batch = bm25.top_k_many(queries, ks, _known_word)
+        with profile_stage("materialize"):
+            return [_project(data, ranked, output_cols) for ranked in batch]
+
+    return _through_query_cache(filepath, search_cols, output_cols, queries, max_results, mode, rank)
 
+
+def _query_cache():
+    """The process-wide QueryCache, or None when QUERY_CACHE_SIZE is 0"""
+    global _QUERY_CACHE
+    if QUERY_CACHE_SIZE <= 0:
+        return None
+    path = INDEX_CACHE_DIR / "query-cache.bin" if QUERY_CACHE_PERSIST and INDEX_CACHE_DIR is not None else None
+    if _QUERY_CACHE is None or (_QUERY_CACHE.size, _QUERY_CACHE.path) != (QUERY_CACHE_SIZE, path):
+        _QUERY_CACHE = QueryCache(QUERY_CACHE_SIZE, path)
+    return _QUERY_CACHE
+
+
+def _through_query_cache(filepath, search_cols, output_cols, queries, max_results, mode, rank):
+    """
+    Results for a batch, answering repeated queries from the QueryCache.
+
+    The key is the file and its overlays, columns, sorted query tokens (so word
+    order, case and punctuation do not matter), max_results, mode and every
+    setting that changes ranking. rank(queries, ks) computes the misses in one call.
+    """
+    cache = None if _FROZEN else _query_cache()  # frozen serving: no file checks, no locks
+    if cache is None:
+        return rank(queries, max_results)
+
+    mode = mode or RETRIEVAL_MODE
+    tokenizer = Tokenizer()
+    settings = (tokenizer.signature, FUZZY_MATCH, FUZZY_MIN_LENGTH, mode,
+                (HYBRID_BM25_WEIGHT, VECTOR_HASH_BITS) if mode == "hybrid" else None)
+    files = [filepath] + _overlay_files(filepath)
+    fingerprint = tuple(_file_fingerprint(path) for path in files)
+    source = tuple(str(path) for path in files)
+    keys = [(source, tuple(search_cols), tuple(output_cols), tuple(sorted(tokenizer(query))), k, settings)
+            for query, k in zip(queries, max_results)]
+    results = [cache.get(key, fingerprint) for key in keys]
+    missing = [i for i, hit in enumerate(results) if hit is None]
+    if missing:
+        computed = rank([queries[i] for i in missing], [max_results[i] for i in missing])
+        for i, rows in zip(missing, computed):
+            cache.put(keys[i], fingerprint, rows)
+            results[i] = rows
     return results
 
 
-def detect_domain(query):
-    """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
+def _project(data, ranked, output_cols):
+    """Materialize output columns for ranked (idx, score) hits, all with score > 0"""
+    return [data.row(idx, output_cols) for idx, score in ranked]
+
+
+def _domain_matcher():
+    """Aho-Corasick automaton over every DOMAIN_KEYWORDS entry, compiled on first use"""
+    global _DOMAIN_MATCHER
+    if _DOMAIN_MATCHER is None:
+        _DOMAIN_MATCHER = AhoCorasick(((kw, (domain, kw)) for domain, keywords in DOMAIN_KEYWORDS.items()
+                                       for kw in keywords))
+    return _DOMAIN_MATCHER
+
+
+def _merged_index(name, parts):
+    """
+    (BM25, first row of each part) over several files' rows at once.
+
+    parts: [(label, BM25)]. Built from their segments without re-tokenizing, so
+    IDF is shared and scores are comparable across parts; cached under name and
+    rebuilt when any part's index changes.
+    """
+    cached = _MERGED.get(name)
+    if cached is not None and len(cached[0]) == len(parts) and \
+            all(a[0] == b[0] and a[1] is b[1] for a, b in zip(cached[0], parts)):
+        return cached[1], cached[2]
 
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
+    segments, rows, df_adjust, starts = [], [], {}, []
+    offset = 0
+    for _, bm25 in parts:
+        starts.append(offset)
+        segments.extend(bm25.segments)
+        rows.extend(array('i', (row + offset if row != DELETED else DELETED for row in seg_rows))
+                    for seg_rows in bm25.rows)
+        for token, n in bm25.df_adjust.items():
+            df_adjust[token] = df_adjust.get(token, 0) + n
+        offset += bm25.N
+    merged = BM25()
+    merged._assign(segments, rows, df_adjust)
+    if _FROZEN:
+        merged.freeze()
+    _MERGED[name] = (parts, merged, starts)
+    return merged, starts
+
+
+def _routing_index():
+    """(BM25, first row of each domain, domains) over every domain's rows at once"""
+    parts = []
+    for domain, config in CSV_CONFIG.items():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            parts.append((domain, _get_data_index(filepath, config["search_cols"])[1]))
+    router, starts = _merged_index("domains", parts)
+    return router, starts, [domain for domain, _ in parts]
+
+
+def detect_domain(query, routing=None):
+    """
+    Auto-detect the most relevant domain from query.
+
+    Every DOMAIN_KEYWORDS hit is counted in one automaton pass. With routing
+    "bm25" (see DOMAIN_ROUTING), ties and keyword-less queries go to the domain
+    of the best-scoring row among the tied domains instead of defaulting to style.
+    """
+    scores = dict.fromkeys(DOMAIN_KEYWORDS, 0)
+    for domain, _ in _domain_matcher().matches(query.lower()):
+        scores[domain] += 1
     best = max(scores, key=scores.get)
+
+    if (routing or DOMAIN_ROUTING) == "bm25":
+        tied = [domain for domain, score in scores.items() if score == scores[best]]
+        if len(tied) > 1:
+            router, starts, domains = _routing_index()
+            for row, _ in router.rank(query, _known_word):
+                domain = domains[bisect_right(starts, row) - 1]
+                if domain in tied:
+                    return domain
+
     return best if scores[best] > 0 else "style"
 
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+def search(query, domain=None, max_results=MAX_RESULTS, routing=None, mode=None):
+    """Main search function with auto-domain detection (mode: "bm25" or "hybrid", see RETRIEVAL_MODE)"""
     if domain is None:
-        domain = detect_domain(query)
+        with profile_stage("detect_domain"):
+            domain = detect_domain(query, routing)
 
     config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
     filepath = DATA_DIR / config["file"]
@@ -220,8 +2093,49 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results, mode)
+    return _domain_response(domain, query, config, results)
+
+
+def search_many(queries, domains=None, max_results=MAX_RESULTS, routing=None, mode=None):
+    """
+    Batch search: same output as [search(q, d, n) for ...], in query order.
+
+    domains and max_results may be a single value applied to every query or a
+    list aligned with queries (None domains are auto-detected with routing). Queries that
+    land on the same domain share one index load and one postings pass.
+    """
+    queries = list(queries)
+    if domains is None or isinstance(domains, str):
+        domains = [domains] * len(queries)
+    if isinstance(max_results, int):
+        max_results = [max_results] * len(queries)
+    domains = [domain if domain is not None else detect_domain(query, routing) for query, domain in zip(queries, domains)]
 
+    groups = {}
+    for i, domain in enumerate(domains):
+        groups.setdefault(domain, []).append(i)
+
+    responses = [None] * len(queries)
+    for domain, members in groups.items():
+        config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            for i in members:
+                responses[i] = {"error": f"File not found: {filepath}", "domain": domain}
+            continue
+
+        with profile_stage(f"search[{domain}]", queries=len(members)):
+            batch = _search_csv_many(filepath, config["search_cols"], config["output_cols"],
+                                     [queries[i] for i in members], [max_results[i] for i in members], mode)
+        for i, results in zip(members, batch):
+            responses[i] = _domain_response(domain, queries[i], config, results)
+
+    return responses
+
+
+def _domain_response(domain, query, config, results):
+    """Result envelope shared by search() and search_many()"""
     return {
         "domain": domain,
         "query": query,
@@ -231,7 +2145,7 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     }
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
+def search_stack(query, stack, max_results=MAX_RESULTS, mode=None):
     """Search stack-specific guidelines"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
@@ -241,7 +2155,7 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results, mode)
 
     return {
         "domain": "stack",
@@ -251,3 +2165,155 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+def _stacks_index(names):
+    """([(stack, BM25)], [rows], merged BM25, first row of each stack) for the stacks whose file exists"""
+    parts, stores = [], []
+    for name in names:
+        filepath = DATA_DIR / STACK_CONFIG[name]["file"]
+        if filepath.exists():
+            data, bm25 = _get_data_index(filepath, _STACK_COLS["search_cols"])
+            parts.append((name, bm25))
+            stores.append(data)
+    merged, starts = _merged_index(("stacks",) + tuple(name for name, _ in parts), parts)
+    return parts, stores, merged, starts
+
+
+def search_stacks(query, stacks="all", max_results=MAX_RESULTS, per_stack=False):
+    """
+    Search several stacks' guidelines in one scoring pass.
+
+    stacks: list of STACK_CONFIG names, one name, or "all". The stack files are scored as
+    one merged index (shared IDF), and each result carries a "Stack" tag.
+    Returns the global top max_results, or with per_stack the top
+    max_results of every stack (in the order given).
+    """
+    if isinstance(stacks, str):
+        stacks = AVAILABLE_STACKS if stacks == "all" else [stacks]
+    names = list(dict.fromkeys(stacks))
+    unknown = [name for name in names if name not in STACK_CONFIG]
+    if unknown:
+        return {"error": f"Unknown stack: {', '.join(unknown)}. Available: {', '.join(AVAILABLE_STACKS)}"}
+
+    parts, stores, merged, starts = _stacks_index(names)
+
+    with profile_stage("score", stacks=len(parts)):
+        if per_stack:
+            scores = merged.score_many([query], _known_word)[0]
+            grouped = [[] for _ in parts]
+            for row, score in scores.items():
+                grouped[bisect_right(starts, row) - 1].append((row, score))
+            ranked = [hit for hits in grouped for hit in nsmallest(max_results, hits, key=lambda x: (-x[1], x[0]))]
+        else:
+            ranked = merged.top_k(query, max_results, _known_word)
+
+    results = []
+    with profile_stage("materialize"):
+        for row, _ in ranked:
+            i = bisect_right(starts, row) - 1
+            results.append({"Stack": parts[i][0], **stores[i].row(row - starts[i], _STACK_COLS["output_cols"])})
+
+    return {
+        "domain": "stack",
+        "stack": ", ".join(name for name, _ in parts),
+        "query": query,
+        "file": ", ".join(STACK_CONFIG[name]["file"] for name, _ in parts),
+        "count": len(results),
+        "results": results
+    }
+
+
+# ============ CONCURRENT SERVING ============
+def freeze_indexes(vectors=False):
+    """
+    Load and freeze every index a search can touch, for serving from many threads.
+
+    Builds each domain and stack index (with overlays, and TF-IDF vectors if
+    asked), the routing and all-stacks indexes and the domain keyword matcher,
+    then freezes every BM25. Until the matching thaw_indexes() (or
+    clear_index_cache()), searches only read these objects: data files are no
+    longer checked for edits, the query cache is bypassed and nothing takes a
+    lock. Calls nest. Returns the files indexed.
+    """
+    global _FROZEN
+    built = build_index_cache(vectors)
+    _domain_matcher()
+    _routing_index()
+    _stacks_index(AVAILABLE_STACKS)
+    for entry in list(_INDEXES.values()):
+        entry[3].freeze()
+    for cached in list(_MERGED.values()):
+        cached[1].freeze()
+    _global_vocabulary()
+    _FROZEN += 1
+    return built
+
+
+def thaw_indexes():
+    """Undo one freeze_indexes(); the last one resumes edit checks, the query cache and memoizing"""
+    global _FROZEN
+    if not _FROZEN:
+        return
+    _FROZEN -= 1
+    if not _FROZEN:
+        for entry in list(_INDEXES.values()):
+            entry[3].thaw()
+        for cached in list(_MERGED.values()):
+            cached[1].thaw()
+
+
+class SearchExecutor:
+    """
+    Thread pool answering searches in parallel from one frozen set of in-process indexes.
+
+    Meant for embedding hosts (an MCP server, a web backend): create one, then
+    submit requests from any thread; every call returns a concurrent.futures.Future.
+
+        with SearchExecutor(workers=8) as executor:
+            future = executor.search("glassmorphism dark", "style")
+            stacks = executor.search_stacks("state management", ["react", "nextjs"])
+            print(future.result(), stacks.result())
+
+    Pass vectors=True to serve mode="hybrid" searches from prebuilt vectors.
+    The indexes stay frozen (see freeze_indexes) until shutdown().
+    """
+
+    def __init__(self, workers=None, vectors=False):
+        from concurrent.futures import ThreadPoolExecutor
+        freeze_indexes(vectors)
+        self._frozen = True
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uipro-search")
+
+    def submit(self, fn, *args, **kwargs):
+        """Run any callable (e.g. a design system generator) on the pool"""
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def map(self, fn, *iterables):
+        """Like Executor.map: results in input order"""
+        return self._pool.map(fn, *iterables)
+
+    def search(self, query, domain=None, max_results=MAX_RESULTS, routing=None, mode=None):
+        return self.submit(search, query, domain, max_results, routing, mode)
+
+    def search_many(self, queries, domains=None, max_results=MAX_RESULTS, routing=None, mode=None):
+        return self.submit(search_many, queries, domains, max_results, routing, mode)
+
+    def search_stack(self, query, stack, max_results=MAX_RESULTS, mode=None):
+        return self.submit(search_stack, query, stack, max_results, mode)
+
+    def search_stacks(self, query, stacks="all", max_results=MAX_RESULTS, per_stack=False):
+        return self.submit(search_stacks, query, stacks, max_results, per_stack)
+
+    def shutdown(self, wait=True):
+        """Stop the pool and undo this executor's freeze"""
+        self._pool.shutdown(wait)
+        if self._frozen:
+            self._frozen = False
+            thaw_indexes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
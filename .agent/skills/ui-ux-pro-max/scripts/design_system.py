@@ -15,10 +15,17 @@ Usage:
 
 import csv
 import json
+import marshal
+from bisect import bisect_right
 import os
-from datetime import datetime
+import sys
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
 from pathlib import Path
-from core import search, DATA_DIR
+import core
+from core import CSV_CONFIG, AhoCorasick, search, search_many, profile_stage, DATA_DIR
 
 
 # ============ CONFIGURATION ============
@@ -32,58 +39,149 @@ SEARCH_CONFIG = {
     "typography": {"max_results": 2}
 }
 
+# Memoized generate() results: max entries (0 disables) and lifetime in seconds
+GENERATION_CACHE_SIZE = 64
+GENERATION_CACHE_TTL = 3600
+
+# Precomputed generate() results for product-type and reasoning-category queries (see build_materialized)
+MATERIALIZED_FILE = "design-systems.bin"
+_MATERIALIZED_VERSION = 3
+
+# Threads running independent domain searches side by side (1 or less: in the caller's thread).
+# Searches are CPU-bound Python, so this only pays off where the GIL is disabled (free-threaded builds)
+SEARCH_WORKERS = 1 if getattr(sys, "_is_gil_enabled", lambda: True)() else 6
+
 
 # ============ DESIGN SYSTEM GENERATOR ============
+class _RuleIndex:
+    """
+    Reasoning rules with precomputed lookups for find(), one per match stage:
+    exact-name hash, an automaton over full category names (name inside the
+    query), a joined haystack (query inside a name) and an automaton over the
+    individual name keywords. All map back to the rule's position, so the
+    earliest rule still wins within each stage. Never modified once built, so a
+    reload swaps in a new instance while lookups in other threads finish on the old one.
+    """
+
+    def __init__(self, rules: list, fingerprint: tuple):
+        self.rules = rules
+        self.fingerprint = fingerprint
+        categories = [rule.get("UI_Category", "").lower() for rule in rules]
+
+        self.exact = {}
+        for i, ui_cat in enumerate(categories):
+            self.exact.setdefault(ui_cat, i)
+
+        self.names = AhoCorasick((ui_cat, i) for i, ui_cat in enumerate(categories))
+        self.haystack = "\n".join(categories)
+        self.starts = []
+        self.ends = []
+        offset = 0
+        for ui_cat in categories:
+            self.starts.append(offset)
+            self.ends.append(offset + len(ui_cat))
+            offset += len(ui_cat) + 1
+
+        self.keywords = AhoCorasick(
+            (kw, i)
+            for i, ui_cat in enumerate(categories)
+            for kw in ui_cat.replace("/", " ").replace("-", " ").split()
+        )
+
+    def first_containing(self, text: str):
+        """Index of the first rule whose category name contains text, or None."""
+        if not self.starts:
+            return None
+        pos = self.haystack.find(text)
+        while pos != -1:
+            i = bisect_right(self.starts, pos) - 1
+            if pos + len(text) <= self.ends[i]:
+                return i
+            pos = self.haystack.find(text, pos + 1)
+        return None
+
+    def find(self, category: str) -> dict:
+        """First rule by exact name, then partial match either way, then keyword; {} if none."""
+        category_lower = category.lower()
+
+        # Try exact match first
+        i = self.exact.get(category_lower)
+        if i is not None:
+            return self.rules[i]
+
+        # Try partial match (rule name inside category, or category inside rule name)
+        hits = self.names.matches(category_lower)
+        containing = self.first_containing(category_lower)
+        if containing is not None:
+            hits.add(containing)
+        if hits:
+            return self.rules[min(hits)]
+
+        # Try keyword match
+        hits = self.keywords.matches(category_lower)
+        if hits:
+            return self.rules[min(hits)]
+
+        return {}
+
+
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
-    def __init__(self):
-        self.reasoning_data = self._load_reasoning()
+    def __init__(self, cache_size: int = GENERATION_CACHE_SIZE, cache_ttl: float = GENERATION_CACHE_TTL):
+        self._reload_reasoning()
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._materialized = None  # (data fingerprint, {normalized query: marshalled design system})
 
     def _load_reasoning(self) -> list:
-        """Load reasoning rules from CSV."""
+        """Load reasoning rules from CSV, followed by any overlay directory's rules."""
         filepath = DATA_DIR / REASONING_FILE
         if not filepath.exists():
             return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
-
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
-        for domain, config in SEARCH_CONFIG.items():
+        rules = []
+        for path in [filepath] + core._overlay_files(filepath):
+            with open(path, 'r', encoding='utf-8') as f:
+                rules.extend(csv.DictReader(f))
+        return rules
+
+    def _reload_reasoning(self):
+        """(Re)load reasoning rules and their lookup structures, published together in one assignment."""
+        with profile_stage("reasoning load"):
+            fingerprint = _data_fingerprint([REASONING_FILE])
+            self._rules = _RuleIndex(self._load_reasoning(), fingerprint)
+
+    @property
+    def reasoning_data(self) -> list:
+        return self._rules.rules
+
+    @property
+    def reasoning_fingerprint(self) -> tuple:
+        return self._rules.fingerprint
+
+    def _submit_searches(self, query: str, domains: list, style_priority: list = None) -> dict:
+        """Start the SEARCH_CONFIG search of each domain on the shared pool; {domain: pending result}."""
+        pending = {}
+        for domain in domains:
+            domain_query = query
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
-            else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                domain_query = f"{query} {priority_query}"
+            pending[domain] = submit_search(domain_query, domain, SEARCH_CONFIG[domain]["max_results"])
+        return pending
+
+    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
+        """Execute searches across multiple domains concurrently; results keep SEARCH_CONFIG order."""
+        with profile_stage("_multi_domain_search"):
+            pending = self._submit_searches(query, list(SEARCH_CONFIG), style_priority)
+            return {domain: pending[domain].result() for domain in SEARCH_CONFIG}
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
-
-        return {}
+        return self._rules.find(category)
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
@@ -161,21 +259,71 @@ class DesignSystemGenerator:
         return search_result.get("results", [])
 
     def generate(self, query: str, project_name: str = None) -> dict:
-        """Generate complete design system recommendation."""
-        # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+        """
+        Generate complete design system recommendation.
+
+        Results are memoized in a bounded LRU keyed on the normalized query and
+        project name. Entries expire after cache_ttl seconds and are dropped as
+        soon as any data file the generator reads changes on disk. Queries naming
+        a product type or reasoning category are answered from the table written
+        by build_materialized() while it matches the data files.
+        """
+        # Searches are case/whitespace-insensitive; only the default project name is not
+        key = (_normalize_query(query), project_name or query.upper(), _search_settings())
+        fingerprint = _data_fingerprint(_GENERATION_FILES)
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == fingerprint and now - entry[1] < self.cache_ttl:
+                self._cache.move_to_end(key)
+                with profile_stage("generate (memoized)"):
+                    return deepcopy(entry[2])
+
+        if _data_fingerprint([REASONING_FILE]) != self.reasoning_fingerprint:
+            self._reload_reasoning()
+
+        materialized = self._lookup_materialized(key[0], (fingerprint, key[2]))
+        if materialized is not None:
+            with profile_stage("generate (materialized)"):
+                design_system = {"project_name": key[1], **marshal.loads(materialized)}
+        else:
+            with profile_stage("generate"):
+                design_system = self._generate(query, project_name)
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[key] = (fingerprint, now, deepcopy(design_system))
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return design_system
+
+    def _lookup_materialized(self, normalized_query: str, stamp: tuple):
+        """Precomputed design system (marshal bytes) for a normalized query, or None; stamp: (data fingerprint, settings)."""
+        table = self._materialized
+        if table is None or table[0] != stamp:
+            table = self._materialized = (stamp, _load_materialized())
+        return table[1].get(normalized_query)
+
+    def _generate(self, query: str, project_name: str = None) -> dict:
+        """Run the searches and reasoning behind generate()."""
+        # Step 1: Search product to get category; every leg that does not depend
+        # on it (all but style) runs alongside
+        pending = self._submit_searches(query, [domain for domain in SEARCH_CONFIG if domain != "style"])
+        product_result = pending["product"].result()
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
             category = product_results[0].get("Product Type", "General")
 
         # Step 2: Get reasoning rules for this category
-        reasoning = self._apply_reasoning(category, {})
+        with profile_stage("_apply_reasoning"):
+            reasoning = self._apply_reasoning(category, {})
         style_priority = reasoning.get("style_priority", [])
 
-        # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
+        # Step 3: Style search with priority hints, then collect the remaining legs
+        with profile_stage("_multi_domain_search"):
+            pending.update(self._submit_searches(query, ["style"], style_priority))
+            search_results = {domain: pending[domain].result() for domain in SEARCH_CONFIG}
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -183,7 +331,8 @@ class DesignSystemGenerator:
         typography_results = self._extract_results(search_results.get("typography", {}))
         landing_results = self._extract_results(search_results.get("landing", {}))
 
-        best_style = self._select_best_match(style_results, reasoning.get("style_priority", []))
+        with profile_stage("_select_best_match"):
+            best_style = self._select_best_match(style_results, reasoning.get("style_priority", []))
         best_color = color_results[0] if color_results else {}
         best_typography = typography_results[0] if typography_results else {}
         best_landing = landing_results[0] if landing_results else {}
@@ -236,6 +385,171 @@ class DesignSystemGenerator:
         }
 
 
+# ============ CONCURRENT SEARCH ============
+def _profiled_leg(fn, query, domain: str, max_results: int):
+    """fn(query, domain, max_results) timed as its own search[domain] stage, whichever thread runs it."""
+    with profile_stage(f"search[{domain}]"):
+        return fn(query, domain, max_results)
+
+
+class _Inline:
+    """Search run in the caller's thread when .result() is called (sequential mode)."""
+
+    def __init__(self, query, domain, max_results, fn=search):
+        self.call = (fn, query, domain, max_results)
+
+    def result(self):
+        return _profiled_leg(*self.call)
+
+
+_SEARCH_POOL = None
+_SEARCH_POOL_LOCK = threading.Lock()
+
+
+def _search_pool():
+    """Shared thread pool for domain searches, started on first use; None when SEARCH_WORKERS <= 1."""
+    global _SEARCH_POOL
+    if SEARCH_WORKERS <= 1:
+        return None
+    with _SEARCH_POOL_LOCK:
+        if _SEARCH_POOL is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _SEARCH_POOL = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="uipro-search")
+        return _SEARCH_POOL
+
+
+def submit_search(query: str, domain: str, max_results: int):
+    """
+    Run core.search() on the shared pool. Returns an object whose .result()
+    gives the search response (or raises its exception).
+
+    Indexes are read-only once loaded, so searches of different domains can run
+    at the same time; callers collect results in a fixed order, so output does
+    not depend on which search finishes first.
+    """
+    pool = _search_pool()
+    if pool is None:
+        return _Inline(query, domain, max_results)
+    return pool.submit(_profiled_leg, search, query, domain, max_results)
+
+
+def _submit_batch(queries: list, domain: str, max_results: int):
+    """search_many() over one domain on the shared pool (see submit_search)."""
+    pool = _search_pool()
+    if pool is None:
+        return _Inline(queries, domain, max_results, search_many)
+    return pool.submit(_profiled_leg, search_many, queries, domain, max_results)
+
+
+# Every data file generate() reads, for cache invalidation
+_GENERATION_FILES = [REASONING_FILE] + [CSV_CONFIG[domain]["file"] for domain in SEARCH_CONFIG]
+
+_GENERATOR = None
+
+
+def _search_settings() -> tuple:
+    """core settings that change what generate()'s searches return."""
+    return (core.Tokenizer().signature, core.FUZZY_MATCH, core.FUZZY_MIN_LENGTH,
+            core.RETRIEVAL_MODE, core.HYBRID_BM25_WEIGHT, core.VECTOR_HASH_BITS)
+
+
+def _data_files(filenames: list) -> list:
+    """(label, path) of each data file followed by its overlay files (see core.OVERLAY_DIRS)."""
+    files = []
+    for name in filenames:
+        files.append((name, DATA_DIR / name))
+        files.extend((str(path), path) for path in core._overlay_files(DATA_DIR / name))
+    return files
+
+
+def _data_fingerprint(filenames: list) -> tuple:
+    """(name, mtime, size) of each data file and overlay; changes whenever a CSV is edited or added."""
+    fingerprint = []
+    for label, path in _data_files(filenames):
+        try:
+            stat = path.stat()
+            fingerprint.append((label, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append((label, None, None))
+    return tuple(fingerprint)
+
+
+def get_generator() -> DesignSystemGenerator:
+    """Process-wide generator, so its reasoning table and memo cache are reused."""
+    global _GENERATOR
+    if _GENERATOR is None:
+        _GENERATOR = DesignSystemGenerator()
+    return _GENERATOR
+
+
+def _normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query (searches ignore both)."""
+    return " ".join(query.lower().split())
+
+
+# ============ MATERIALIZED DESIGN SYSTEMS ============
+def _materialized_path():
+    """Lookup file next to the search index cache, or None when caching is disabled."""
+    return core.INDEX_CACHE_DIR / MATERIALIZED_FILE if core.INDEX_CACHE_DIR is not None else None
+
+
+def _materialization_key() -> tuple:
+    """Everything a materialized answer depends on besides the query: versions, settings and data."""
+    import hashlib
+    digests = []
+    for label, path in _data_files(_GENERATION_FILES):
+        try:
+            digests.append((label, hashlib.sha1(path.read_bytes()).hexdigest()))
+        except OSError:
+            digests.append((label, None))
+    return (_MATERIALIZED_VERSION, sys.version_info[:2], _search_settings(), repr(SEARCH_CONFIG), tuple(digests))
+
+
+def _load_materialized() -> dict:
+    """{normalized query: marshalled design system}; empty when missing or built from other data."""
+    path = _materialized_path()
+    if path is None:
+        return {}
+    try:
+        key, table = marshal.loads(path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    return table if key == _materialization_key() else {}
+
+
+def build_materialized() -> int:
+    """
+    Precompute generate() for every products.csv Product Type and reasoning
+    UI_Category and write them to MATERIALIZED_FILE. Returns the entry count.
+    """
+    path = _materialized_path()
+    if path is None:
+        return 0
+    generator = DesignSystemGenerator(cache_size=0)
+    names = [rule.get("UI_Category", "") for rule in generator.reasoning_data]
+    product_file = DATA_DIR / CSV_CONFIG["product"]["file"]
+    if product_file.exists():
+        for product_path in [product_file] + core._overlay_files(product_file):
+            with open(product_path, 'r', encoding='utf-8') as f:
+                names += [row.get("Product Type", "") for row in csv.DictReader(f)]
+
+    table = {}
+    cache_size, core.QUERY_CACHE_SIZE = core.QUERY_CACHE_SIZE, 0  # one-off searches; keep the user's query cache
+    try:
+        for name in names:
+            normalized = _normalize_query(name)
+            if normalized and normalized not in table:
+                design_system = generator._generate(name)
+                del design_system["project_name"]  # filled in per request
+                table[normalized] = marshal.dumps(design_system)
+    finally:
+        core.QUERY_CACHE_SIZE = cache_size
+
+    if not core._write_bytes_atomic(path, marshal.dumps((_materialization_key(), table))):
+        return 0
+    return len(table)
+
+
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
@@ -460,7 +774,7 @@ def format_markdown(design_system: dict) -> str:
 
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page=None, output_dir: str = None) -> str:
     """
     Main entry point for design system generation.
 
@@ -469,37 +783,42 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         project_name: Optional project name for output header
         output_format: "ascii" (default) or "markdown"
         persist: If True, save design system to design-system/ folder
-        page: Optional page name for page-specific override file
+        page: Optional page name for page-specific override file, or a list of
+              page names / (page name, page query) pairs (see persist_design_system)
         output_dir: Optional output directory (defaults to current working directory)
 
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
+    design_system = get_generator().generate(query, project_name)
     
     # Persist to files if requested
     if persist:
-        persist_design_system(design_system, page, output_dir, query)
+        with profile_stage("persist"):
+            persist_design_system(design_system, page, output_dir, query)
 
-    if output_format == "markdown":
-        return format_markdown(design_system)
-    return format_ascii_box(design_system)
+    with profile_stage("format", output_format=output_format):
+        if output_format == "markdown":
+            return format_markdown(design_system)
+        return format_ascii_box(design_system)
 
 
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+def persist_design_system(design_system: dict, page=None, output_dir: str = None, page_query: str = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
     
     Args:
         design_system: The generated design system dictionary
-        page: Optional page name for page-specific override file
+        page: Optional page name for page-specific override file, or a list of
+              page names / (page name, page query) pairs to persist in one batch
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
+                    (default for pages without their own query)
     
     Returns:
-        dict with created file paths and status
+        dict with created file paths and status; unchanged_files lists the ones
+        left untouched because their content (ignoring timestamps) was the same
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
@@ -511,6 +830,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     pages_dir = design_system_dir / "pages"
     
     created_files = []
+    unchanged_files = []
     
     # Create directories
     design_system_dir.mkdir(parents=True, exist_ok=True)
@@ -518,27 +838,64 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     
     master_file = design_system_dir / "MASTER.md"
     
-    # Generate and write MASTER.md
+    # Generate and write MASTER.md (once per batch)
     master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
+    if not _write_if_changed(master_file, master_content):
+        unchanged_files.append(str(master_file))
     created_files.append(str(master_file))
     
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
+    # Page override files with intelligent content; their searches run batched across pages
+    pages = _page_specs(page, page_query)
+    searches = _page_searches([_page_context(name, query) for name, query in pages])
+    for name, query in pages:
+        page_file = pages_dir / f"{name.lower().replace(' ', '-')}.md"
+        page_content = format_page_override_md(design_system, name, query, searches[_page_context(name, query)])
+        if not _write_if_changed(page_file, page_content):
+            unchanged_files.append(str(page_file))
         created_files.append(str(page_file))
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files,
+        "unchanged_files": unchanged_files
     }
 
 
+def _page_specs(page, page_query: str = None) -> list:
+    """Normalize persist_design_system's page argument to [(page name, page query)]."""
+    if not page:
+        return []
+    if isinstance(page, str):
+        page = [page]
+    specs = []
+    for item in page:
+        if isinstance(item, str):
+            specs.append((item, page_query))
+        else:
+            name, query = item
+            specs.append((name, query or page_query))
+    return specs
+
+
+def _content_digest(content: str) -> str:
+    """Hash of a generated file, ignoring its "Generated:" timestamp line."""
+    import hashlib
+    body = "\n".join(line for line in content.splitlines() if "**Generated:**" not in line)
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Atomically replace path with content unless only the timestamp would change; True if written."""
+    try:
+        existing = path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        existing = None
+    if existing is not None and _content_digest(existing) == _content_digest(content):
+        return False
+    return core._write_bytes_atomic(path, content.encode('utf-8'), ignore_errors=False)
+
+
 def format_master_md(design_system: dict) -> str:
     """Format design system as MASTER.md with hierarchical override logic."""
     project = design_system.get("project_name", "PROJECT")
@@ -549,6 +906,7 @@ def format_master_md(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
     
+    from datetime import datetime
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     lines = []
@@ -802,14 +1160,15 @@ def format_master_md(design_system: dict) -> str:
     return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None, searches: tuple = None) -> str:
     """Format a page-specific override file with intelligent AI-generated content."""
     project = design_system.get("project_name", "PROJECT")
+    from datetime import datetime
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system, searches)
     
     lines = []
     
@@ -911,23 +1270,43 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+# Domain searches (domain, max results) behind every page override
+PAGE_SEARCHES = [("style", 1), ("ux", 3), ("landing", 1)]
+
+
+def _page_context(page_name: str, page_query: str = None) -> str:
+    """Search text for a page: its name plus the page query."""
+    return f"{page_name.lower()} {(page_query or '').lower()}"
+
+
+def _page_searches(contexts: list) -> dict:
+    """
+    {context: PAGE_SEARCHES responses} for many pages at once: one batched
+    search_many() per domain, with repeated contexts searched only once.
+    """
+    unique = list(dict.fromkeys(contexts))
+    if not unique:
+        return {}
+    pending = [_submit_batch(unique, domain, n) for domain, n in PAGE_SEARCHES]
+    per_domain = [p.result() for p in pending]
+    return {context: tuple(responses) for context, responses in zip(unique, zip(*per_domain))}
+
+
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict, searches: tuple = None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
-    data instead of hardcoded page types.
+    data instead of hardcoded page types. searches: PAGE_SEARCHES responses
+    already fetched for this page (see _page_searches).
     """
-    from core import search
-    
-    page_lower = page_name.lower()
-    query_lower = (page_query or "").lower()
-    combined_context = f"{page_lower} {query_lower}"
+    combined_context = _page_context(page_name, page_query)
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    if searches is None:
+        pending = [submit_search(combined_context, domain, n) for domain, n in PAGE_SEARCHES]
+        searches = [p.result() for p in pending]
+    style_search, ux_search, landing_search = searches
     
     # Extract results from search response
     style_results = style_search.get("results", [])
@@ -2,29 +2,90 @@
 # -*- coding: utf-8 -*-
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
-Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3] [--routing bm25] [--mode hybrid]
+       python search.py "<query>" --stacks react nextjs shadcn [--per-stack]
+       python search.py "<query>" --stacks all
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py "<query>" --design-system --persist --page home --page pricing --page "checkout=one-page checkout"
+       python search.py --build-index
+       python search.py "<query>" [...] --profile [trace.json]
+       python search.py "<query>" [...] --cache-stats
+       python search.py "<query>" [...] --overlay ./design-system/data [--overlay DIR ...]
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
-Stacks: html-tailwind, react, nextjs
+Stacks: html-tailwind, react, nextjs, ... (--stacks takes several, or "all": one merged, globally ranked
+        search; --per-stack returns the top results of each stack instead)
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
-  --page       Also create a page-specific override file in design-system/pages/
+  --page       Also create page-specific override files in design-system/pages/; repeat it for
+               several pages ("name" or "name=page query"), sharing one MASTER.md and batched searches.
+               Files whose content is unchanged (ignoring timestamps) are not rewritten.
+
+Retrieval:
+  --mode hybrid  Rank by BM25 fused with hashed TF-IDF cosine similarity (better recall for long,
+                 natural-language prompts); vectors are built on first use or by --build-index
+
+Index cache:
+  --build-index  Precompile every domain/stack index into .index-cache/ (also built lazily on first use)
+                 and precompute the design system of every product type and reasoning category;
+                 each index is also written as a flat .map file that concurrent processes mmap
+                 read-only, sharing one copy of postings and rows (core.SHARED_INDEX)
+
+Overlays:
+  --overlay DIR  Extra data directory whose CSVs (same names as data/, e.g. styles.csv,
+                 stacks/react.csv, ui-reasoning.csv) add rows to the shipped ones; each is indexed
+                 on its own and merged with the prebuilt index at query time. Defaults to
+                 $UIPRO_OVERLAY (os.pathsep-separated), else ./design-system/data if present.
+
+Query cache:
+  Results are memoized by (domain/stack, query words in any order/case, max results) in memory
+  and in .index-cache/query-cache.bin, and dropped when the data file changes (core.QUERY_CACHE_*).
+  --cache-stats  Print the cache's hit/miss counters to stderr
+
+Profiling:
+  --profile    Print wall/CPU time per stage (CSV load, tokenize, BM25.fit, score, reasoning,
+               each domain search, format/persist) to stderr; with a path, also write a
+               Chrome trace (chrome://tracing, ui.perfetto.dev). Always runs in-process.
+
+Server mode:
+  Start `python server.py` to keep every index in memory; this CLI then forwards
+  its requests over the server's Unix socket automatically (--no-server to opt out).
 """
 
+import time
+_STARTED = time.perf_counter()
+
 import argparse
+import os
 import sys
-import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, DOMAIN_ROUTING, RETRIEVAL_MODE, OVERLAY_DIRS, search, search_stack, search_stacks, \
+    build_index_cache, query_cache_stats, find_overlay_dirs, \
+    profile_stage, start_profiling, stop_profiling
+
+# Seconds spent importing each module; design_system and server load only when a sub-command needs them
+IMPORT_TIMES = {"core": time.perf_counter() - _STARTED}
+
+
+def lazy_import(name):
+    """Import a module on first use, recording how long it took"""
+    if name not in sys.modules:
+        start = time.perf_counter()
+        with profile_stage(f"import {name}"):
+            __import__(name)
+        IMPORT_TIMES[name] = time.perf_counter() - start
+    return sys.modules[name]
 
-# Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
-if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+def utf8_output():
+    """Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)"""
+    if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
+        import io
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 
 def format_output(result):
@@ -53,12 +114,27 @@ def format_output(result):
     return "\n".join(output)
 
 
+def from_server(payload):
+    """Answer a request through a running server.py daemon; None means run it locally"""
+    # A server searching other overlay directories refuses, and the request runs here
+    payload = {**payload, "overlays": [str(path) for path in OVERLAY_DIRS]}
+    reply = lazy_import("server").request(payload)
+    if reply is None or not reply.get("ok"):
+        return None
+    return reply["result"]
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
-    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
+    stack_group = parser.add_mutually_exclusive_group()
+    stack_group.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs, ...)")
+    stack_group.add_argument("--stacks", nargs="+", choices=AVAILABLE_STACKS + ["all"], metavar="STACK", help="Search several stacks, or 'all', together in one global ranking")
+    parser.add_argument("--per-stack", action="store_true", help="With --stacks: top results of each stack instead of one global ranking")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
+    parser.add_argument("--routing", choices=["keywords", "bm25"], default=DOMAIN_ROUTING, help="Domain auto-detection when --domain is omitted (default: keywords)")
+    parser.add_argument("--mode", choices=["bm25", "hybrid"], default=RETRIEVAL_MODE, help="Ranking: BM25, or BM25 fused with TF-IDF cosine (default: bm25)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
@@ -66,21 +142,60 @@ if __name__ == "__main__":
     parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
     # Persistence (Master + Overrides pattern)
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
-    parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
+    parser.add_argument("--page", action="append", default=None, metavar="PAGE[=QUERY]", help="Create page-specific override files in design-system/pages/ (repeatable; optional per-page query after '=')")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Index cache
+    parser.add_argument("--build-index", action="store_true", help="Precompile the on-disk index for every domain and stack, and materialize per-category design systems")
+    parser.add_argument("--overlay", action="append", default=None, metavar="DIR", help="Overlay data directory adding rows to the shipped CSVs (repeatable; default: $UIPRO_OVERLAY or ./design-system/data)")
+    parser.add_argument("--no-server", action="store_true", help="Search in this process even if server.py is running")
+    parser.add_argument("--cache-stats", action="store_true", help="Report query result cache hits/misses on stderr")
+    parser.add_argument("--import-time", action="store_true", help="Report module import and total startup time on stderr")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="TRACE_JSON",
+                        help="Report per-stage timings on stderr; optionally write a Chrome trace JSON file")
 
     args = parser.parse_args()
+    utf8_output()
+    if args.page:
+        # "name=query" gives a page its own override query
+        args.page = [tuple(p.split("=", 1)) if "=" in p else p for p in args.page]
+    missing = [d for d in args.overlay or [] if not os.path.isdir(d)]
+    if missing:
+        parser.error(f"overlay directory not found: {', '.join(missing)}")
+    OVERLAY_DIRS[:] = find_overlay_dirs(args.overlay)
+    if args.profile is not None:
+        args.no_server = True  # stages run in the server otherwise
+        start_profiling()
+
+    if args.build_index:
+        built = build_index_cache(vectors=True)
+        materialized = lazy_import("design_system").build_materialized()
+        print(f"Indexed {len(built)} data files, materialized {materialized} design systems")
+        sys.exit(0)
+    if args.query is None:
+        parser.error("the following arguments are required: query")
 
     # Design system takes priority
     if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
-            persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
-        )
+        result = None
+        if not args.no_server:
+            result = from_server({
+                "op": "design_system",
+                "query": args.query,
+                "project_name": args.project_name,
+                "format": args.format,
+                "persist": args.persist,
+                "page": args.page,
+                "output_dir": os.path.abspath(args.output_dir or os.getcwd())
+            })
+        if result is None:
+            result = lazy_import("design_system").generate_design_system(
+                args.query, 
+                args.project_name, 
+                args.format,
+                persist=args.persist,
+                page=args.page,
+                output_dir=args.output_dir
+            )
         print(result)
         
         # Print persistence confirmation
@@ -89,26 +204,65 @@ if __name__ == "__main__":
             print("\n" + "=" * 60)
             print(f"✅ Design system persisted to design-system/{project_slug}/")
             print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
-            if args.page:
-                page_filename = args.page.lower().replace(' ', '-')
+            for page in args.page or []:
+                page_filename = (page if isinstance(page, str) else page[0]).lower().replace(' ', '-')
                 print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
             print("")
             print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
             print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
             print("=" * 60)
     # Stack search
+    elif args.stacks:
+        if args.mode == "hybrid":
+            parser.error("--mode hybrid searches one stack at a time")
+        stacks = "all" if "all" in args.stacks else args.stacks
+        result = None
+        if not args.no_server:
+            result = from_server({"op": "search_stacks", "query": args.query, "stacks": stacks,
+                                  "max_results": args.max_results, "per_stack": args.per_stack})
+        if result is None:
+            result = search_stacks(args.query, stacks, args.max_results, args.per_stack)
+        if args.json:
+            print(lazy_import("json").dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        result = None
+        if not args.no_server:
+            result = from_server({"op": "search_stack", "query": args.query, "stack": args.stack,
+                                  "max_results": args.max_results, "mode": args.mode})
+        if result is None:
+            result = search_stack(args.query, args.stack, args.max_results, args.mode)
         if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
+            print(lazy_import("json").dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        result = None
+        if not args.no_server:
+            result = from_server({"op": "search", "query": args.query, "domain": args.domain,
+                                  "max_results": args.max_results, "routing": args.routing, "mode": args.mode})
+        if result is None:
+            result = search(args.query, args.domain, args.max_results, args.routing, args.mode)
         if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
+            print(lazy_import("json").dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
+
+    if args.profile is not None:
+        profiler = stop_profiling()
+        print(profiler.summary(), file=sys.stderr)
+        if args.profile:
+            with open(args.profile, 'w', encoding='utf-8') as f:
+                lazy_import("json").dump(profiler.chrome_trace(), f)
+            print(f"Trace written to {args.profile}", file=sys.stderr)
+
+    if args.cache_stats:
+        # The server's counters when it answered, else this process's
+        stats = (from_server({"op": "cache_stats"}) if not args.no_server else None) or query_cache_stats()
+        print(f"Query cache: {stats}", file=sys.stderr)
+
+    if args.import_time:
+        imports = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in IMPORT_TIMES.items())
+        print(f"Imports: {imports} | total {(time.perf_counter() - _STARTED) * 1000:.1f} ms", file=sys.stderr)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Server - resident search daemon keeping every index hot in memory
+Usage: python server.py [--socket PATH] [--overlay DIR ...]     # run in the foreground
+       python server.py --stop [--socket PATH]
+
+Protocol: newline-delimited JSON over a Unix domain socket, one request per line.
+  {"op": "search", "query": "...", "domain": "style", "max_results": 3, "routing": "keywords", "mode": "bm25"}
+  {"op": "search_stack", "query": "...", "stack": "react", "max_results": 3, "mode": "bm25"}
+  {"op": "search_stacks", "query": "...", "stacks": ["react", "nextjs"] | "all", "max_results": 3, "per_stack": false}
+  {"op": "design_system", "query": "...", "project_name": null, "format": "ascii",
+   "persist": false, "page": null | "name" | ["name", ["name", "page query"], ...], "output_dir": "/abs/path"}
+  {"op": "cache_stats"}   -> query result cache hit/miss counters
+  {"op": "ping"} | {"op": "shutdown"}
+Search requests may carry "overlays": [absolute dirs]; they must match the server's own
+overlay directories (--overlay, $UIPRO_OVERLAY or ./design-system/data where it was started).
+Each reply is one line: {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+
+search.py uses the server transparently whenever it is running (disable with --no-server).
+"""
+
+import os
+import socket
+import stat
+import sys
+from pathlib import Path
+
+# Seconds to wait for a reply before the CLI falls back to searching locally
+CLIENT_TIMEOUT = 30.0
+
+
+def default_socket_path() -> str:
+    """
+    Per-user, per-install socket path, overridable with UIPRO_SOCKET.
+
+    Sockets live in a private (0700) per-user directory under $XDG_RUNTIME_DIR,
+    else the temp dir, so other local users can neither squat nor reach them.
+    """
+    if os.environ.get("UIPRO_SOCKET"):
+        return os.environ["UIPRO_SOCKET"]
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    # Same lookup order as tempfile.gettempdir(), without importing tempfile on every CLI call
+    base = (os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR")
+            or os.environ.get("TEMP") or os.environ.get("TMP"))
+    if not base:
+        import tempfile
+        base = tempfile.gettempdir()
+    # Each copy of the skill (e.g. a project-local one) gets its own server, answering from its own data
+    import zlib
+    data_dir = str(Path(__file__).resolve().parent.parent / "data")
+    return str(Path(base) / f"ui-ux-pro-max-{user}" / f"{zlib.crc32(data_dir.encode('utf-8')):08x}.sock")
+
+
+def _is_default(socket_path: str) -> bool:
+    """True when default_socket_path() picks the socket (no --socket, no UIPRO_SOCKET)."""
+    return not socket_path and not os.environ.get("UIPRO_SOCKET")
+
+
+def _owned(path: str, kind) -> bool:
+    """True when path (not followed if a symlink) is a kind (stat.S_ISDIR, ...) owned by this user."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not kind(st.st_mode):
+        return False
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def _private_dir(path: str, create: bool = False) -> bool:
+    """True when path is a directory only this user can enter; created with mode 0700 if asked."""
+    if create:
+        try:
+            os.mkdir(path, 0o700)
+        except FileExistsError:
+            pass
+        except OSError:
+            return False
+    return _owned(path, stat.S_ISDIR) and not (hasattr(os, "getuid") and os.lstat(path).st_mode & 0o077)
+
+
+# ============ CLIENT ============
+def request(payload: dict, socket_path: str = None):
+    """
+    Send one request to a running server.
+
+    Returns the reply dict, or None when no server is reachable (or the socket,
+    or its directory for the default path, belongs to another user, or the reply
+    is malformed) so callers can fall back to searching in-process.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = socket_path or default_socket_path()
+    if _is_default(socket_path) and not _private_dir(os.path.dirname(path)):
+        return None
+    if not _owned(path, stat.S_ISSOCK):
+        return None
+    import json
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CLIENT_TIMEOUT)
+            sock.connect(path)
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    try:
+        reply = json.loads(line.decode("utf-8"))
+    except ValueError:
+        return None
+    return reply if isinstance(reply, dict) else None
+
+
+# ============ SERVER ============
+def _dispatch(message: dict):
+    """Run one request against the in-process indexes."""
+    from core import OVERLAY_DIRS, search, search_stack, search_stacks, query_cache_stats
+    from design_system import generate_design_system
+
+    op = message.get("op")
+    if op == "ping":
+        return "pong"
+    if op == "shutdown":
+        return "bye"
+    if op == "cache_stats":
+        return query_cache_stats()
+    if message.get("overlays", []) != [str(path) for path in OVERLAY_DIRS]:
+        raise ValueError("Overlay directories differ from the server's")
+    if op == "search":
+        return search(message["query"], message.get("domain"), message.get("max_results", 3),
+                      message.get("routing"), message.get("mode"))
+    if op == "search_stack":
+        return search_stack(message["query"], message["stack"], message.get("max_results", 3), message.get("mode"))
+    if op == "search_stacks":
+        return search_stacks(message["query"], message.get("stacks", "all"), message.get("max_results", 3),
+                             message.get("per_stack", False))
+    if op == "design_system":
+        return generate_design_system(
+            message["query"],
+            message.get("project_name"),
+            message.get("format", "ascii"),
+            persist=message.get("persist", False),
+            page=message.get("page"),
+            output_dir=message.get("output_dir")
+        )
+    raise ValueError(f"Unknown op: {op}")
+
+
+def serve(socket_path: str = None, overlays: list = None):
+    """Warm every index, then answer requests until a shutdown op arrives."""
+    import json
+    import socketserver
+    import threading
+    from core import OVERLAY_DIRS, build_index_cache, find_overlay_dirs
+    from design_system import get_generator
+
+    OVERLAY_DIRS[:] = find_overlay_dirs(overlays)
+    path = socket_path or default_socket_path()
+    if _is_default(socket_path) and not _private_dir(os.path.dirname(path), create=True):
+        raise SystemExit(f"Socket directory {os.path.dirname(path)} is not a private directory of this user")
+    if request({"op": "ping"}, path) is not None:
+        raise SystemExit(f"Server already running on {path}")
+    if os.path.lexists(path):
+        if not _owned(path, stat.S_ISSOCK):
+            raise SystemExit(f"{path} exists and is not this user's socket; remove it or pass --socket")
+        os.unlink(path)  # stale socket from a crashed server
+
+    build_index_cache()
+    get_generator()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line.decode("utf-8"))
+                    reply = {"ok": True, "result": _dispatch(message)}
+                except Exception as e:
+                    message = {}
+                    reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+                if message.get("op") == "shutdown":
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+    old_umask = os.umask(0o177)  # the socket is owner-only from the moment it is bound
+    try:
+        server = Server(path, Handler)
+    finally:
+        os.umask(old_umask)
+    with server:
+        print(f"UI Pro Max server listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="UI Pro Max search server")
+    parser.add_argument("--socket", type=str, default=None, help="Unix socket path (default: per-user temp path or $UIPRO_SOCKET)")
+    parser.add_argument("--stop", action="store_true", help="Stop a running server")
+    parser.add_argument("--overlay", action="append", default=None, metavar="DIR", help="Overlay data directory (repeatable; default: $UIPRO_OVERLAY or ./design-system/data)")
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise SystemExit("Unix domain sockets are not available on this platform")
+    if args.stop:
+        reply = request({"op": "shutdown"}, args.socket)
+        print("Server stopped" if reply else "No server running")
+    else:
+        serve(args.socket, args.overlay)
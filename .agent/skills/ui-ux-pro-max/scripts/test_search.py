@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Tests - regression checks for the search engine and design-system generator
+Usage: python -m unittest test_search        (from this directory)
+"""
+
+import csv
+import hashlib
+import marshal
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPTS_DIR.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import core
+import design_system
+
+
+def _tree_digest(root: Path) -> dict:
+    """{relative path: sha1} of every file below root."""
+    return {str(path.relative_to(root)): hashlib.sha1(path.read_bytes()).hexdigest()
+            for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+# ============ INDEX EQUIVALENCE ============
+WORDS = ["alpha", "beta", "gamma", "delta", "omega", "sigma", "theta", "kappa", "zeta", "café", "naïve-x", "42"]
+COLS = ["Name", "Text"]
+
+
+def _random_rows(rng: random.Random, count: int) -> list:
+    return [{"Name": rng.choice(WORDS), "Text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))}
+            for _ in range(count)]
+
+
+def _write_rows(path: Path, rows: list):
+    """Write rows as CSV, always moving the file's mtime forward."""
+    before = path.stat().st_mtime_ns if path.exists() else 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.utime(path, ns=(before + 10 ** 9, before + 10 ** 9))
+
+
+class IndexEquivalenceTest(unittest.TestCase):
+    """Every index path ranks exactly like a BM25 fitted from scratch on the same rows."""
+
+    SETTINGS = ("DATA_DIR", "INDEX_CACHE_DIR", "SHARED_INDEX", "FUZZY_MATCH", "QUERY_CACHE_SIZE")
+
+    def setUp(self):
+        self.saved = {name: getattr(core, name) for name in self.SETTINGS}
+        self.saved_overlays = list(core.OVERLAY_DIRS)
+        self.root = Path(tempfile.mkdtemp(prefix="uipro-test-"))
+        core.DATA_DIR = self.root / "data"
+        core.INDEX_CACHE_DIR = self.root / "cache"
+        core.FUZZY_MATCH = True
+        core.QUERY_CACHE_SIZE = 0
+        core.OVERLAY_DIRS[:] = []
+        core.clear_index_cache()
+        self.rng = random.Random(11)
+        self.path = core.DATA_DIR / "sample.csv"
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(core, name, value)
+        core.OVERLAY_DIRS[:] = self.saved_overlays
+        core.clear_index_cache()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def assertRanksLike(self, bm25, rows):
+        """top_k, top_k_many and rank of bm25 match a fresh fit over rows."""
+        reference = core.BM25()
+        reference.fit([" ".join(row[col] for col in COLS) for row in rows])
+        queries = [" ".join(self.rng.choice(WORDS + ["nope"]) for _ in range(self.rng.randint(1, 4)))
+                   for _ in range(40)]
+        ks = [self.rng.randint(1, 8) for _ in queries]
+        expected = [reference.rank(query)[:k] for query, k in zip(queries, ks)]
+        for query, k, ranked in zip(queries, ks, expected):
+            self.assertHitsEqual(bm25.top_k(query, k), ranked, query)
+            self.assertHitsEqual(bm25.rank(query)[:k], ranked, query)
+        for got, ranked, query in zip(bm25.top_k_many(queries, ks), expected, queries):
+            self.assertHitsEqual(got, ranked, query)
+
+    def assertHitsEqual(self, got, expected, query):
+        self.assertEqual([row for row, _ in got], [row for row, _ in expected], query)
+        for (_, a), (_, b) in zip(got, expected):
+            self.assertAlmostEqual(a, b, places=9, msg=query)
+
+    def test_fresh_and_mapped(self):
+        rows = _random_rows(self.rng, 300)
+        _write_rows(self.path, rows)
+        _, bm25 = core._get_index(self.path, COLS)
+        self.assertRanksLike(bm25, rows)
+        core.clear_index_cache()
+        _, mapped = core._get_index(self.path, COLS)
+        self.assertIsInstance(mapped.segments[0], core.MappedSegment)
+        self.assertRanksLike(mapped, rows)
+
+    def test_delta(self):
+        core.SHARED_INDEX = False  # the published map is compacted; check the patched index itself
+        rows = _random_rows(self.rng, 300)
+        _write_rows(self.path, rows)
+        core._get_index(self.path, COLS)
+        for _ in range(4):
+            rows = list(rows)
+            for _ in range(8):
+                op = self.rng.random()
+                if op < 0.3:
+                    rows.pop(self.rng.randrange(len(rows)))
+                elif op < 0.6:
+                    rows.insert(self.rng.randint(0, len(rows)), _random_rows(self.rng, 1)[0])
+                else:
+                    rows[self.rng.randrange(len(rows))] = _random_rows(self.rng, 1)[0]
+            _write_rows(self.path, rows)
+            _, bm25 = core._get_index(self.path, COLS)
+            self.assertGreater(len(bm25.segments), 1)
+            self.assertRanksLike(bm25, rows)
+
+    def test_overlay(self):
+        rows, extra = _random_rows(self.rng, 200), _random_rows(self.rng, 40)
+        _write_rows(self.path, rows)
+        overlay = self.root / "overlay"
+        _write_rows(overlay / "sample.csv", extra)
+        core.OVERLAY_DIRS[:] = [overlay]
+        data, merged = core._get_data_index(self.path, COLS)
+        self.assertEqual(data.n_rows, len(rows) + len(extra))
+        self.assertRanksLike(merged, rows + extra)
+
+    def test_correction_without_data_files(self):
+        rows = _random_rows(self.rng, 100)
+        bm25 = core.BM25()
+        bm25.fit([" ".join(row[col] for col in COLS) for row in rows])
+        core.DATA_DIR = self.root / "missing"
+        self.assertEqual(bm25.rank("gamna")[:5], bm25.rank("gamma")[:5])
+        self.assertEqual(bm25.rank("gamna", known_word={"gamna"}.__contains__), [])
+
+
+# ============ HYBRID RETRIEVAL ============
+def _dense_cosines(token_lists: list, query_tokens: list, bits: int) -> dict:
+    """{row: cosine} of plain-dict TF-IDF vectors, the textbook form of VectorIndex."""
+    docs = [core._vector_features(tokens, bits) for tokens in token_lists]
+    df = {}
+    for features in docs:
+        for h in features:
+            df[h] = df.get(h, 0) + 1
+    idf = {h: math.log((len(docs) + 1) / (n + 1)) + 1 for h, n in df.items()}
+
+    def unit(features):
+        weights = {h: (1 + math.log(tf)) * idf[h] for h, tf in features.items() if h in idf}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {h: w / norm for h, w in weights.items()} if norm else {}
+
+    query = unit(core._vector_features(query_tokens, bits))
+    cosines = {}
+    for row, features in enumerate(docs):
+        doc = unit(features)
+        dot = sum(w * doc.get(h, 0.0) for h, w in query.items())
+        if dot > 0:
+            cosines[row] = dot
+    return cosines
+
+
+class HybridTest(unittest.TestCase):
+    """The hybrid mode's vector scores and fusion, fresh and from the on-disk cache."""
+
+    SETTINGS = ("DATA_DIR", "INDEX_CACHE_DIR", "QUERY_CACHE_SIZE")
+
+    def setUp(self):
+        self.saved = {name: getattr(core, name) for name in self.SETTINGS}
+        self.root = Path(tempfile.mkdtemp(prefix="uipro-test-"))
+        core.DATA_DIR = self.root / "data"
+        core.INDEX_CACHE_DIR = self.root / "cache"
+        core.QUERY_CACHE_SIZE = 0
+        core.clear_index_cache()
+        self.rng = random.Random(19)
+        self.path = core.DATA_DIR / "sample.csv"
+        self.rows = _random_rows(self.rng, 150)
+        _write_rows(self.path, self.rows)
+        self.docs = [" ".join(row[col] for col in COLS) for row in self.rows]
+        self.queries = [" ".join(self.rng.choice(WORDS) for _ in range(self.rng.randint(1, 4))) for _ in range(30)]
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(core, name, value)
+        core.clear_index_cache()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_cosines_match_dense_vectors(self):
+        bm25 = core.BM25()
+        token_lists = [bm25.tokenize(doc) for doc in self.docs]
+        for bits in (4, core.VECTOR_HASH_BITS):  # 4 bits: plenty of hash collisions
+            vectors = core.VectorIndex(bits)
+            vectors.fit(token_lists)
+            got = vectors.cosine_many([bm25.tokenize(query) for query in self.queries])
+            for query, cosines in zip(self.queries, got):
+                expected = _dense_cosines(token_lists, bm25.tokenize(query), bits)
+                self.assertEqual(sorted(cosines), sorted(expected), query)
+                for row, cosine in cosines.items():
+                    self.assertAlmostEqual(cosine, expected[row], places=9, msg=query)
+
+    def test_fusion_weights(self):
+        data, bm25, vectors = core._get_vectors(self.path, COLS)
+        ks = [5] * len(self.queries)
+        only_bm25 = core.hybrid_top_k_many(bm25, vectors, self.queries, ks, bm25_weight=1.0)
+        for query, ranked in zip(self.queries, only_bm25):
+            self.assertEqual([row for row, _ in ranked], [row for row, _ in bm25.top_k(query, 5)], query)
+        only_vectors = core.hybrid_top_k_many(bm25, vectors, self.queries, ks, bm25_weight=0.0)
+        for cosines, ranked in zip(vectors.cosine_many([bm25.tokenize(q) for q in self.queries]), only_vectors):
+            self.assertEqual(ranked, sorted(cosines.items(), key=lambda x: (-x[1], x[0]))[:5])
+
+    def test_cached_vectors(self):
+        fresh = [core._search_csv(self.path, COLS, COLS, query, 5, "hybrid") for query in self.queries]
+        core.clear_index_cache()
+        self.assertTrue(list(core.INDEX_CACHE_DIR.glob("*.vec")))
+        cached = core._search_csv_many(self.path, COLS, COLS, self.queries, [5] * len(self.queries), "hybrid")
+        self.assertEqual(cached, fresh)
+
+
+# ============ QUERY CACHE ============
+QUERY_CACHE_SCRIPT = """
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+import core
+core.INDEX_CACHE_DIR = Path(sys.argv[2])
+core.QUERY_CACHE_SIZE = 8
+core._search_csv(Path(sys.argv[3]), ["Name", "Text"], ["Name"], "alpha beta", 3)
+print(core.query_cache_stats()["hits"])
+"""
+
+
+class QueryCacheTest(unittest.TestCase):
+    """Repeated searches are answered from the query cache only while that is indistinguishable."""
+
+    SETTINGS = ("INDEX_CACHE_DIR", "QUERY_CACHE_SIZE", "QUERY_CACHE_PERSIST")
+
+    def setUp(self):
+        self.saved = {name: getattr(core, name) for name in self.SETTINGS}
+        self.root = Path(tempfile.mkdtemp(prefix="uipro-test-"))
+        core.INDEX_CACHE_DIR = self.root / "cache"
+        core.QUERY_CACHE_SIZE = 4
+        core.QUERY_CACHE_PERSIST = False
+        core.clear_index_cache()
+        core.clear_query_cache()
+        self.path = self.root / "data" / "sample.csv"
+        self.rows = _random_rows(random.Random(5), 200)
+        _write_rows(self.path, self.rows)
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(core, name, value)
+        core.clear_index_cache()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def search(self, query, k=3, mode=None):
+        return core._search_csv(self.path, COLS, COLS, query, k, mode)
+
+    def test_key_normalization(self):
+        first = self.search("alpha Beta gamma")
+        self.assertEqual(self.search("GAMMA alpha, beta"), first)
+        self.assertEqual(core.query_cache_stats()["hits"], 1)
+        self.search("alpha beta gamma", k=4)
+        self.search("alpha beta gamma", mode="hybrid")
+        self.assertEqual(core.query_cache_stats()["hits"], 1)
+        self.assertEqual(core.query_cache_stats()["misses"], 3)
+
+    def test_invalidated_by_data_change(self):
+        before = self.search("alpha")
+        self.rows[:0] = [{"Name": "alpha", "Text": "alpha alpha alpha alpha"}]
+        _write_rows(self.path, self.rows)
+        after = self.search("alpha")
+        self.assertNotEqual(after, before)
+        self.assertEqual(after[0], self.rows[0])
+        stats = core.query_cache_stats()
+        self.assertEqual((stats["hits"], stats["invalidations"]), (0, 1))
+
+    def test_lru_eviction(self):
+        for word in WORDS[:5]:
+            self.search(word)
+        self.search(WORDS[1])
+        self.search(WORDS[0])
+        stats = core.query_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["size"]), (1, 6, 2, 4))
+        core.clear_query_cache()
+        self.assertEqual(core.query_cache_stats()["size"], 0)
+
+    def test_disk_tier_shared_across_processes(self):
+        run = [sys.executable, "-c", QUERY_CACHE_SCRIPT, str(SCRIPTS_DIR), str(core.INDEX_CACHE_DIR), str(self.path)]
+        first = subprocess.run(run, check=True, capture_output=True, text=True)
+        self.assertTrue((core.INDEX_CACHE_DIR / "query-cache.bin").exists())
+        second = subprocess.run(run, check=True, capture_output=True, text=True)
+        self.assertEqual((first.stdout.split(), second.stdout.split()), (["0"], ["1"]))
+
+
+# ============ STACK SEARCH ============
+class StackSearchTest(unittest.TestCase):
+    """search_stacks over several stacks ranks like one BM25 fitted on all their rows."""
+
+    def setUp(self):
+        saved_overlays = list(core.OVERLAY_DIRS)
+        self.addCleanup(core.OVERLAY_DIRS.__setitem__, slice(None), saved_overlays)
+        core.OVERLAY_DIRS[:] = []
+        self.names = ["react", "vue", "flutter", "swiftui"]
+        self.rows, self.docs = [], []
+        for name in self.names:
+            with open(core.DATA_DIR / core.STACK_CONFIG[name]["file"], 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    self.rows.append((name, row))
+                    self.docs.append(" ".join(str(row.get(col, "")) for col in core._STACK_COLS["search_cols"]))
+        self.reference = core.BM25()
+        self.reference.fit(self.docs)
+        self.queries = ["state management", "accessibility labels", "list performance keys",
+                        "navigation", "animaton", "form validation errors", "zzzz"]
+
+    def hits(self, results):
+        return [(hit["Stack"], hit["Guideline"], hit["Description"]) for hit in results["results"]]
+
+    def expected(self, ranked):
+        return [(self.rows[i][0], self.rows[i][1]["Guideline"], self.rows[i][1]["Description"]) for i, _ in ranked]
+
+    def test_merged_ranking(self):
+        for query in self.queries:
+            ranked = self.reference.rank(query, core._known_word)[:6]
+            self.assertEqual(self.hits(core.search_stacks(query, self.names, 6)), self.expected(ranked), query)
+
+    def test_per_stack(self):
+        bounds = [i for i, (name, _) in enumerate(self.rows) if i == 0 or self.rows[i - 1][0] != name]
+        bounds.append(len(self.rows))
+        for query in self.queries:
+            ranked = self.reference.rank(query, core._known_word)
+            expected = []
+            for start, end in zip(bounds, bounds[1:]):
+                expected += [hit for hit in ranked if start <= hit[0] < end][:3]
+            got = core.search_stacks(query, self.names, 3, per_stack=True)
+            self.assertEqual(self.hits(got), self.expected(expected), query)
+            self.assertEqual(got["stack"], ", ".join(self.names))
+
+
+# ============ REASONING RULES ============
+def _linear_reasoning_rule(rules: list, category: str) -> dict:
+    """The original scan: exact category, then substring either way, then any category word."""
+    category_lower = category.lower()
+    for rule in rules:
+        if rule.get("UI_Category", "").lower() == category_lower:
+            return rule
+    for rule in rules:
+        ui_cat = rule.get("UI_Category", "").lower()
+        if ui_cat in category_lower or category_lower in ui_cat:
+            return rule
+    for rule in rules:
+        keywords = rule.get("UI_Category", "").lower().replace("/", " ").replace("-", " ").split()
+        if any(kw in category_lower for kw in keywords):
+            return rule
+    return {}
+
+
+class ReasoningRuleTest(unittest.TestCase):
+    """The indexed _find_reasoning_rule picks the same rule as a linear scan."""
+
+    def test_matches_linear_scan(self):
+        generator = design_system.DesignSystemGenerator(cache_size=0)
+        rules = generator.reasoning_data
+        with open(core.DATA_DIR / "products.csv", 'r', encoding='utf-8') as f:
+            categories = [row["Product Type"] for row in csv.DictReader(f)]
+        categories += [rule.get("UI_Category", "") for rule in rules]
+        rng = random.Random(3)
+        words = sorted({word for category in categories for word in category.lower().replace("/", " ").split()})
+        categories += [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(200)]
+        categories += [category[i:i + 5] for category in categories[:50] for i in (0, 3)]
+        categories += ["", "General", "zzz", "ai", "SaaS", "web app", "E-COMMERCE", "x/y-z"]
+        for category in categories:
+            self.assertEqual(generator._find_reasoning_rule(category), _linear_reasoning_rule(rules, category), category)
+
+    def test_matches_linear_scan_on_random_rules(self):
+        rng = random.Random(7)
+        parts = ["web", "app", "saas", "e", "commerce", "ai/ml", "b2b", "x-y", "fin", "tech", "fintech", "a", ""]
+        for _ in range(30):
+            rules = [{"UI_Category": rng.choice([" ", "/", "-", ""]).join(rng.sample(parts, rng.randint(1, 3)))}
+                     for _ in range(rng.randint(0, 12))]
+            index = design_system._RuleIndex(rules, None)
+            for _ in range(40):
+                category = rng.choice([" ", "", "-"]).join(rng.sample(parts, rng.randint(0, 3)))
+                category = category.upper() if rng.random() < 0.2 else category
+                self.assertIs(index.find(category) or None, _linear_reasoning_rule(rules, category) or None,
+                              (rules, category))
+
+    def test_reload_while_searching(self):
+        generator = design_system.DesignSystemGenerator(cache_size=0)
+        full = generator.reasoning_data
+        variants = [full, full[len(full) // 2:]]
+        categories = [rule.get("UI_Category", "") for rule in full] + ["web app", "zzz"]
+        allowed = {category: [_linear_reasoning_rule(rules, category) for rules in variants] for category in categories}
+        reloads = iter(range(300))
+        generator._load_reasoning = lambda: variants[next(reloads, 0) % 2]
+        errors = []
+
+        def lookups():
+            try:
+                for _ in range(20):
+                    for category in categories:
+                        if generator._find_reasoning_rule(category) not in allowed[category]:
+                            errors.append(category)
+            except Exception as e:  # an IndexError from mixing old positions with new rules
+                errors.append(repr(e))
+
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)  # switch threads often enough to land inside a reload
+        threads = [threading.Thread(target=lookups) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(300):
+            generator._reload_reasoning()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+
+# ============ MATERIALIZED DESIGN SYSTEMS ============
+class MaterializedTest(unittest.TestCase):
+    """build_materialized stores exactly what _generate computes and leaves the query cache alone."""
+
+    def setUp(self):
+        self.saved = (core.INDEX_CACHE_DIR, core.QUERY_CACHE_SIZE)
+        self.root = Path(tempfile.mkdtemp(prefix="uipro-test-"))
+        core.INDEX_CACHE_DIR = self.root
+        core.QUERY_CACHE_SIZE = 16
+        core.clear_index_cache()
+
+    def tearDown(self):
+        core.INDEX_CACHE_DIR, core.QUERY_CACHE_SIZE = self.saved
+        core.clear_index_cache()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_matches_generate(self):
+        core.clear_query_cache()
+        core.search("fintech dashboard", "style", 3)
+        before = core.query_cache_stats()
+        count = design_system.build_materialized()
+        self.assertEqual(core.query_cache_stats(), before)
+        self.assertEqual(core.QUERY_CACHE_SIZE, 16)
+
+        table = design_system._load_materialized()
+        self.assertEqual(len(table), count)
+        self.assertGreater(count, 100)
+        generator = design_system.DesignSystemGenerator(cache_size=0)
+        stamp = (design_system._data_fingerprint(design_system._GENERATION_FILES), design_system._search_settings())
+        for query in table:
+            expected = generator._generate(query)
+            del expected["project_name"]
+            self.assertEqual(marshal.loads(generator._lookup_materialized(query, stamp)), expected, query)
+
+
+# ============ PERSIST ============
+class PersistTest(unittest.TestCase):
+    """persist_design_system leaves files alone when only their timestamp would change."""
+
+    def setUp(self):
+        self.out = Path(tempfile.mkdtemp(prefix="uipro-test-"))
+        self.addCleanup(shutil.rmtree, self.out, True)
+        self.design_system = design_system.DesignSystemGenerator(cache_size=0).generate("fintech dashboard", "Demo")
+
+    def persist(self, design_system_dict):
+        return design_system.persist_design_system(design_system_dict, ["Checkout", "Settings"], str(self.out))
+
+    def test_unchanged_files_kept(self):
+        first = self.persist(self.design_system)
+        self.assertEqual(first["unchanged_files"], [])
+        stamps = {path: os.stat(path).st_mtime_ns for path in first["created_files"]}
+        for path in stamps:
+            os.utime(path, ns=(1, 1))
+        second = self.persist(self.design_system)
+        self.assertEqual(second["unchanged_files"], second["created_files"])
+        self.assertEqual({os.stat(path).st_mtime_ns for path in stamps}, {1})
+
+        changed = dict(self.design_system, key_effects="Parallax scrolling")
+        third = self.persist(changed)
+        self.assertNotIn(str(self.out / "design-system" / "demo" / "MASTER.md"), third["unchanged_files"])
+        self.assertIn("Parallax scrolling", (self.out / "design-system" / "demo" / "MASTER.md").read_text(encoding='utf-8'))
+        self.assertEqual([path.name for path in self.out.rglob("*.tmp")], [])
+
+
+# ============ BUILD INDEX ============
+class BuildIndexTest(unittest.TestCase):
+    """search.py --build-index writes only to the index cache."""
+
+    def setUp(self):
+        self.skill = Path(tempfile.mkdtemp(prefix="uipro-test-"))
+        self.addCleanup(shutil.rmtree, self.skill, True)
+        shutil.copytree(SKILL_DIR / "data", self.skill / "data")
+        (self.skill / "scripts").mkdir()
+        for script in SCRIPTS_DIR.glob("*.py"):
+            shutil.copy2(script, self.skill / "scripts" / script.name)
+        self.overlay = self.skill / "overlay"
+        self.overlay.mkdir()
+        shutil.copy2(SKILL_DIR / "data" / "products.csv", self.overlay / "products.csv")
+
+    def build(self, *extra):
+        env = {k: v for k, v in os.environ.items() if k != "UIPRO_OVERLAY"}
+        subprocess.run([sys.executable, str(self.skill / "scripts" / "search.py"), "--build-index", *extra],
+                       cwd=self.skill, env=env, check=True, capture_output=True)
+
+    def test_data_unchanged(self):
+        data, overlay = _tree_digest(self.skill / "data"), _tree_digest(self.overlay)
+        self.build()
+        self.build("--overlay", str(self.overlay))
+        self.assertEqual(_tree_digest(self.skill / "data"), data)
+        self.assertEqual(_tree_digest(self.overlay), overlay)
+        self.assertTrue((self.skill / ".index-cache" / "design-systems.bin").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()